@@ -0,0 +1,9 @@
+"""
+Бенчмарки yatube. Запускаются из корня репозитория как модули:
+
+    python -m benchmarks.search --posts 1000000
+
+Каждый бенчмарк работает с отдельной базой SQLite (--db) и наполняет
+ее синтетическими данными, если она пуста. benchmarks.load замеряет
+страницы через запущенный WSGI-сервер и сохраняет результаты в JSON.
+"""
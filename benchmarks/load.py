@@ -0,0 +1,268 @@
+"""
+Нагрузочный тест главной, страниц группы, профиля и поста. Запускает
+benchmarks.server на базе бенчмарков и воспроизводит смесь адресов
+в --concurrency потоков:
+
+    python -m benchmarks.seed --posts 1000000 --users 50000 --groups 1000
+    python -m benchmarks.load --duration 60 --concurrency 16 \\
+        --output results.json --compare previous.json
+
+Для каждой страницы печатаются запросы в секунду и перцентили
+задержки; --output сохраняет их в JSON для сравнения между коммитами.
+"""
+import argparse
+import http.client
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.server import DEFAULT_PORT
+from benchmarks.utils import (BASE_DIR, add_arguments, percentile, seed,
+                              setup_django)
+
+# Доли страниц в смеси запросов.
+URL_MIX = (
+    ('index', 40),
+    ('group_list', 20),
+    ('profile', 20),
+    ('post_detail', 20),
+)
+# Чем больше показатель, тем сильнее запросы сосредоточены на первых
+# (популярных) группах, авторах и постах.
+SKEW = 3
+LATENCY_KEYS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+class UrlMix:
+    """Случайные адреса страниц в долях URL_MIX."""
+    def __init__(self, slugs, usernames, min_post, max_post):
+        self.slugs = slugs
+        self.usernames = usernames
+        self.min_post = min_post
+        self.max_post = max_post
+        self.names = [name for name, _ in URL_MIX]
+        self.weights = [weight for _, weight in URL_MIX]
+
+    def popular(self, rnd, items):
+        return items[int(len(items) * rnd.random() ** SKEW)]
+
+    def choose(self, rnd):
+        name = rnd.choices(self.names, self.weights)[0]
+        if name == 'index':
+            return name, '/'
+        if name == 'group_list':
+            return name, '/group/{0}/'.format(self.popular(rnd, self.slugs))
+        if name == 'profile':
+            return name, '/profile/{0}/'.format(
+                self.popular(rnd, self.usernames))
+        post_id = self.max_post - int(
+            (self.max_post - self.min_post) * rnd.random() ** SKEW)
+        return name, '/posts/{0}/'.format(post_id)
+
+
+def load_url_mix():
+    from django.contrib.auth import get_user_model
+    from django.db.models import Max, Min
+    from posts.models import Group, Post
+
+    posts = Post.objects.aggregate(min=Min('pk'), max=Max('pk'))
+    return UrlMix(
+        list(Group.objects.order_by('pk').values_list('slug', flat=True)),
+        list(get_user_model().objects.order_by('pk').values_list(
+            'username', flat=True)),
+        posts['min'],
+        posts['max'],
+    )
+
+
+def start_server(db, port):
+    """Запускает benchmarks.server и ждет, пока он начнет слушать порт."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.server',
+         '--db', db, '--port', str(port)],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError('Сервер завершился с кодом {0}'.format(
+                server.returncode))
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('Сервер не запустился за 60 с')
+
+
+def server_timing(header):
+    """Длительности из заголовка Server-Timing в миллисекундах."""
+    durations = {}
+    for metric in filter(None, header.split(',')):
+        name, *params = metric.strip().split(';')
+        for param in params:
+            if param.startswith('dur='):
+                durations[name] = float(param[4:])
+    return durations
+
+
+def request(port, path):
+    """
+    Выполняет GET path и возвращает статус, время ответа в миллисекундах
+    и замеры Server-Timing.
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    started = time.perf_counter()
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+    finally:
+        connection.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    return (response.status, elapsed,
+            server_timing(response.getheader('Server-Timing', '')))
+
+
+def run_load(port, mix, concurrency, duration, warmup, seed=0):
+    """
+    Нагружает сервер concurrency потоками в течение duration секунд
+    после warmup секунд прогрева. Возвращает замеры по страницам.
+    """
+    results = defaultdict(list)
+    lock = threading.Lock()
+    started = time.monotonic()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker(number):
+        rnd = random.Random(seed * 1000 + number)
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                return
+            name, path = mix.choose(rnd)
+            try:
+                sample = request(port, path)
+            except OSError:
+                sample = (None, None, {})
+            if now >= measure_from:
+                with lock:
+                    results[name].append(sample)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return results
+
+
+def summarize(samples, duration):
+    """Запросы в секунду, ошибки и перцентили задержки страницы."""
+    ok = [sample for sample in samples if sample[0] == 200]
+    latencies = sorted(elapsed for _, elapsed, _ in ok)
+    summary = {
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        'rps': round(len(ok) / duration, 1),
+    }
+    if latencies:
+        for key in LATENCY_KEYS:
+            summary[key] = round(percentile(latencies, int(key[1:3])), 2)
+    for metric in ('db', 'total'):
+        values = sorted(
+            timing[metric] for _, _, timing in ok if metric in timing)
+        if values:
+            summary['server_{0}_p50_ms'.format(metric)] = percentile(
+                values, 50)
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def change(summary, old, key):
+    """Изменение метрики key к прошлому запуску в процентах."""
+    if not old.get(key):
+        return 0.0
+    return 100 * (summary.get(key, 0) / old[key] - 1)
+
+
+def print_report(views, previous=None):
+    print('{0:<14}{1:>9}{2:>8}{3:>10}{4:>10}{5:>10}'.format(
+        'страница', 'rps', 'ошибки', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for name, summary in views.items():
+        print('{0:<14}{1:>9.1f}{2:>8}{3:>10.2f}{4:>10.2f}{5:>10.2f}'.format(
+            name, summary['rps'], summary['errors'],
+            *[summary.get(key, 0) for key in LATENCY_KEYS]))
+        old = (previous or {}).get(name)
+        if old:
+            rps, p50, p95, p99 = [
+                change(summary, old, key) for key in ('rps',) + LATENCY_KEYS]
+            print('{0:<14}{1:>+8.1f}%{2:>8}{3:>+9.1f}%{4:>+9.1f}%{5:>+9.1f}%'
+                  .format('  изменение', rps, '', p50, p95, p99))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Количество одновременных клиентов.')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='Длительность замера в секундах.')
+    parser.add_argument('--warmup', type=float, default=5,
+                        help='Прогрев в секундах, не входит в замер.')
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    parser.add_argument('--compare',
+                        help='JSON прошлого запуска для сравнения.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    seed(args.posts, args.users, args.groups)
+    mix = load_url_mix()
+
+    server = start_server(args.db, args.port)
+    try:
+        results = run_load(args.port, mix, args.concurrency, args.duration,
+                           args.warmup)
+    finally:
+        server.terminate()
+        server.wait()
+
+    views = {name: summarize(results[name], args.duration)
+             for name, _ in URL_MIX}
+    views['all'] = summarize(
+        [sample for samples in results.values() for sample in samples],
+        args.duration)
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)['views']
+    print_report(views, previous)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'commit': git_commit(),
+                'finished_at': datetime.now(timezone.utc).isoformat(),
+                'options': {
+                    key: value for key, value in vars(args).items()
+                    if key not in ('output', 'compare')
+                },
+                'views': views,
+            }, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
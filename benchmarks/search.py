@@ -0,0 +1,47 @@
+"""
+Сравнение полнотекстового поиска FTS5 с поиском LIKE '%term%'
+(прежний путь PostAdmin.search_fields):
+
+    python -m benchmarks.search --posts 1000000
+"""
+import argparse
+
+from benchmarks.utils import add_arguments, measure, report, seed, setup_django
+
+# Частое слово, слова средней частоты и редкое слово.
+QUERIES = ('пост', 'футбол', 'слово100', 'слово5000', 'кошка слово300')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    setup_django(args.db)
+    seed(args.posts, args.users, args.groups)
+
+    from django.core.paginator import Paginator
+    from posts.models import Post
+    from posts.search import PostSearchResults
+
+    def fts(query):
+        page = Paginator(PostSearchResults(query), 10).get_page(1)
+        return list(page), page.paginator.count
+
+    def like(query):
+        posts = Post.objects.feed()
+        for word in query.split():
+            posts = posts.filter(text__icontains=word)
+        page = Paginator(posts, 10).get_page(1)
+        return list(page), page.paginator.count
+
+    print('Постов: {0}'.format(Post.objects.count()))
+    for query in QUERIES:
+        report('FTS5  "{0}"'.format(query),
+               measure(lambda: fts(query), args.repeat))
+        report('LIKE  "{0}"'.format(query),
+               measure(lambda: like(query), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
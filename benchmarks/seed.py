@@ -0,0 +1,25 @@
+"""
+Наполнение базы бенчмарков синтетическими данными без запуска
+измерений, например перед нагрузочным тестом:
+
+    python -m benchmarks.seed --posts 1000000 --users 50000 --groups 1000
+"""
+import argparse
+import time
+
+from benchmarks.utils import add_arguments, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    args = parser.parse_args()
+    setup_django(args.db)
+    started = time.perf_counter()
+    seed(args.posts, args.users, args.groups)
+    print('Готово за {0:.1f} с: {1}'.format(
+        time.perf_counter() - started, args.db))
+
+
+if __name__ == '__main__':
+    main()
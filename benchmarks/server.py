@@ -0,0 +1,53 @@
+"""
+WSGI-сервер yatube.wsgi на базе бенчмарков для нагрузочного теста
+benchmarks.load. Запросы обрабатываются в потоках, как в runserver,
+но с DEBUG = False и кешем шаблонов, как в работе:
+
+    python -m benchmarks.server --port 8765
+"""
+import argparse
+import os
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.utils import DEFAULT_DB, setup_django
+
+DEFAULT_PORT = 8765
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    """Обработчик без строки лога на каждый запрос."""
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', default=DEFAULT_DB,
+                        help='Файл базы SQLite для бенчмарка.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    os.environ.setdefault('YATUBE_CACHED_TEMPLATES', '1')
+    setup_django(args.db)
+
+    from django.conf import settings
+    settings.DEBUG = False
+    from yatube.wsgi import application
+
+    server = make_server(
+        args.host, args.port, application,
+        server_class=ThreadingWSGIServer,
+        handler_class=QuietWSGIRequestHandler,
+    )
+    print('Слушаю http://{0}:{1}/'.format(args.host, args.port), flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Смешанная нагрузка чтения лент и публикации постов на SQLite
+с настройками по умолчанию (журнал DELETE, новое соединение на каждый
+запрос) и с SQLITE_PRAGMAS и CONN_MAX_AGE из настроек проекта:
+
+    python -m benchmarks.sqlite --readers 8 --writers 2 --duration 10
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import add_arguments, percentile, seed, setup_django
+
+# Настройки SQLite по умолчанию; timeout драйвера Django - 5 секунд.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def run_mix(readers, writers, duration, authors, groups):
+    """
+    Выполняет чтения ленты группы и публикации постов в потоках
+    в течение duration секунд. Каждая операция обрамлена
+    close_old_connections, как запрос в request_started
+    и request_finished.
+    """
+    from django.db import OperationalError, close_old_connections
+    from posts.models import Post
+
+    stop_at = time.monotonic() + duration
+    lock = threading.Lock()
+    stats = {'reads': [], 'writes': [], 'errors': 0}
+
+    def read(number):
+        group_id = groups[number % len(groups)]
+        list(Post.objects.feed().filter(group_id=group_id)[:10])
+
+    def write(number):
+        Post.objects.create(
+            text='Пост под нагрузкой {0}'.format(number),
+            author_id=authors[number % len(authors)],
+            group_id=groups[number % len(groups)],
+        )
+
+    def worker(operation, kind, number):
+        while time.monotonic() < stop_at:
+            close_old_connections()
+            started = time.perf_counter()
+            try:
+                operation(number)
+            except OperationalError:
+                with lock:
+                    stats['errors'] += 1
+            else:
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    stats[kind].append(elapsed)
+            finally:
+                close_old_connections()
+            number += readers + writers
+
+    jobs = [(read, 'reads', i) for i in range(readers)]
+    jobs += [(write, 'writes', readers + i) for i in range(writers)]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        for future in [executor.submit(worker, *job) for job in jobs]:
+            future.result()
+    return stats
+
+
+def configure(pragmas, conn_max_age):
+    """Закрывает соединения и задает настройки для новых."""
+    from django.conf import settings
+    from django.db import connection
+
+    connection.close()
+    settings.SQLITE_PRAGMAS = pragmas
+    settings.DATABASES['default']['CONN_MAX_AGE'] = conn_max_age
+    # Режим журнала переключается при первом соединении.
+    connection.ensure_connection()
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+    setup_django(args.db)
+    seed(args.posts, args.users, args.groups)
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from posts.models import Group
+
+    authors = list(get_user_model().objects.values_list(
+        'pk', flat=True)[:100])
+    groups = list(Group.objects.values_list('pk', flat=True)[:20])
+    configs = (
+        ('по умолчанию', DEFAULT_PRAGMAS, 0),
+        ('WAL + pragmas', settings.SQLITE_PRAGMAS,
+         settings.DATABASES['default']['CONN_MAX_AGE']),
+    )
+    for name, pragmas, conn_max_age in configs:
+        configure(pragmas, conn_max_age)
+        stats = run_mix(
+            args.readers, args.writers, args.duration, authors, groups)
+        reads, writes = sorted(stats['reads']), sorted(stats['writes'])
+        print('{0:<16} чтений/с {1:8.1f}  записей/с {2:7.1f}  '
+              'p95 чтения {3:7.2f} ms  p95 записи {4:7.2f} ms  '
+              'ошибок {5}'.format(
+                  name, len(reads) / args.duration,
+                  len(writes) / args.duration,
+                  percentile(reads, 95) if reads else 0,
+                  percentile(writes, 95) if writes else 0,
+                  stats['errors']))
+
+
+if __name__ == '__main__':
+    main()
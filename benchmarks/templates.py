@@ -0,0 +1,108 @@
+"""
+Скорость отрисовки шаблонов лент и поста с загрузчиками шаблонов
+без кеша (шаблоны разбираются при каждом запросе) и с cached.Loader:
+
+    python -m benchmarks.templates --repeat 500
+"""
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.utils import (DEFAULT_DB, measure, random_text, report,
+                              setup_django)
+
+BASE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def make_engine(cached):
+    """Бэкенд шаблонов проекта с кешем шаблонов или без него."""
+    from django.conf import settings
+    from django.template.backends.django import DjangoTemplates
+
+    config = settings.TEMPLATES[0]
+    loaders = BASE_LOADERS
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', BASE_LOADERS)]
+    return DjangoTemplates({
+        'NAME': 'cached' if cached else 'plain',
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {**config['OPTIONS'], 'loaders': loaders},
+    })
+
+
+def make_pages(per_page):
+    """
+    Контексты страниц с несохраненными постами: отрисовка не делает
+    запросов к базе и измеряет только работу шаблонов.
+    """
+    from django.contrib.auth import get_user_model
+    from posts.models import Group, Post
+    from posts.paginators import CursorPage, CursorPaginator
+
+    rnd = random.Random(0)
+    now = datetime.now(timezone.utc)
+    author = get_user_model()(
+        pk=1, username='author', first_name='Имя', last_name='Фамилия')
+    group = Group(pk=1, title='Группа', slug='group',
+                  description=random_text(rnd))
+    posts = [
+        Post(pk=i, text=random_text(rnd, 40), author=author,
+             group=group if i % 2 else None,
+             pub_date=now - timedelta(minutes=i), updated_at=now)
+        for i in range(per_page)
+    ]
+    paginator = CursorPaginator(Post.objects.none(), per_page)
+    page_obj = CursorPage(posts, paginator, True, True)
+    feed = {'page_obj': page_obj, 'feed_cache_timeout': 0}
+    return {
+        'posts/index.html': {**feed, 'feed_key': 'index'},
+        'posts/group_list.html': {
+            **feed, 'feed_key': 'group', 'group': group},
+        'posts/profile.html': {
+            **feed, 'feed_key': 'profile', 'author': author,
+            'post_quantity': per_page},
+        'posts/post_detail.html': {
+            'post_profile': posts[0], 'title': posts[0].text[:30],
+            'posts_count': per_page},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', default=DEFAULT_DB,
+                        help='Файл базы SQLite для бенчмарка.')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=10)
+    args = parser.parse_args()
+    setup_django(args.db)
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory, override_settings
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    pages = make_pages(args.per_page)
+    engines = [make_engine(cached=False), make_engine(cached=True)]
+    dummy_cache = {
+        'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    }
+    with override_settings(CACHES=dummy_cache):
+        for name, context in pages.items():
+            for engine in engines:
+                def render(engine=engine, name=name, context=context):
+                    # Как и view, шаблон загружается на каждый запрос.
+                    engine.get_template(name).render(context, request)
+                render()
+                timings = measure(render, args.repeat)
+                report('{0:<8} {1}'.format(engine.name, name), timings)
+                total = sum(timings) / 1000
+                print('{0:>40} {1:9.0f} renders/s'.format(
+                    '', args.repeat / total))
+
+
+if __name__ == '__main__':
+    main()
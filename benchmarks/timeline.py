@@ -0,0 +1,82 @@
+"""
+Чтение ленты подписок читателя с 10 000 подписок: материализованная
+лента TimelineEntry против выборки author__in= при чтении:
+
+    python -m benchmarks.timeline --posts 1000000 --users 20000
+"""
+import argparse
+
+from benchmarks.utils import add_arguments, measure, report, seed, setup_django
+
+READER = 'timeline-reader'
+
+
+def prepare_reader(followees):
+    """
+    Создает читателя, подписанного на followees первых авторов,
+    и заполняет его ленту постами этих авторов напрямую в SQL.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+
+    User = get_user_model()
+    reader, created = User.objects.get_or_create(username=READER)
+    if not created:
+        return reader
+    with connection.cursor() as cursor, transaction.atomic():
+        cursor.execute(
+            'INSERT INTO posts_follow (user_id, author_id) '
+            'SELECT %s, id FROM auth_user WHERE id <> %s ORDER BY id '
+            'LIMIT %s', [reader.pk, reader.pk, followees])
+        cursor.execute(
+            'INSERT INTO posts_timelineentry '
+            '(user_id, post_id, author_id, pub_date) '
+            'SELECT %s, posts_post.id, posts_post.author_id, '
+            'posts_post.pub_date FROM posts_post '
+            'JOIN posts_follow ON posts_follow.author_id = '
+            'posts_post.author_id AND posts_follow.user_id = %s',
+            [reader.pk, reader.pk])
+        cursor.execute('ANALYZE')
+    return reader
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument('--followees', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=20,
+                        help='Глубина листания ленты.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    seed(args.posts, max(args.users, args.followees + 1), args.groups)
+
+    from posts.models import Follow, Post, TimelineEntry
+    from posts.paginators import CursorPaginator
+
+    reader = prepare_reader(args.followees)
+    followees = Follow.objects.filter(user=reader).values('author_id')
+
+    def read(queryset, pages):
+        paginator = CursorPaginator(queryset, 10)
+        page = paginator.get_page()
+        for _ in range(pages - 1):
+            list(page)
+            page = paginator.get_page(after=page.next_cursor)
+        return list(page)
+
+    timeline = TimelineEntry.objects.filter(user=reader).select_related(
+        'post__author', 'post__group').order_by('-pub_date', '-post_id')
+    on_read = Post.objects.feed().filter(author__in=followees)
+
+    print('Подписок: {0}, записей в ленте: {1}'.format(
+        followees.count(), TimelineEntry.objects.filter(user=reader).count()))
+    for pages in (1, args.pages):
+        report('TimelineEntry, страниц: {0}'.format(pages),
+               measure(lambda: read(timeline, pages), args.repeat))
+        report('author__in=, страниц: {0}'.format(pages),
+               measure(lambda: read(on_read, pages), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'yatube')
+DEFAULT_DB = os.path.join(BASE_DIR, 'bench.sqlite3')
+WORDS = (
+    'пост группа автор лента новость город погода музыка книга кино '
+    'кошка собака море горы лес река путешествие работа учеба код '
+    'python django запрос индекс кеш сервер база данных страница '
+    'утро вечер весна лето осень зима друзья семья спорт футбол'
+).split()
+# Частоты слов распределены по закону Ципфа: к частым словам из WORDS
+# добавляется длинный хвост редких слов «слово<N>».
+VOCABULARY = WORDS + ['слово{0}'.format(i) for i in range(20000)]
+CUM_WEIGHTS = list(itertools.accumulate(
+    1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+SEED_BATCH = 10000
+
+
+def setup_django(db_path=DEFAULT_DB):
+    """Настраивает Django на базу бенчмарка и применяет миграции."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def add_arguments(parser):
+    """Общие аргументы командной строки бенчмарков."""
+    parser.add_argument('--db', default=DEFAULT_DB,
+                        help='Файл базы SQLite для бенчмарка.')
+    parser.add_argument('--posts', type=int, default=100000,
+                        help='Количество постов в базе.')
+    parser.add_argument('--users', type=int, default=1000,
+                        help='Количество авторов.')
+    parser.add_argument('--groups', type=int, default=100,
+                        help='Количество групп.')
+
+
+def random_text(rnd, words=30):
+    return ' '.join(rnd.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+
+
+def seed(posts, users, groups, seed=0):
+    """
+    Наполняет базу пользователями, группами и постами через
+    executemany. Уже существующие строки не дублируются: добавляется
+    только недостающее количество.
+    """
+    from django.db import connection, transaction
+
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    with connection.cursor() as cursor, transaction.atomic():
+        cursor.execute('SELECT COUNT(*) FROM auth_user')
+        existing = cursor.fetchone()[0]
+        cursor.executemany(
+            'INSERT INTO auth_user (password, is_superuser, username, '
+            'first_name, last_name, email, is_staff, is_active, '
+            'date_joined) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)',
+            [('!', False, 'user{0}'.format(i), 'Имя', 'Фамилия{0}'.format(i),
+              '', False, True, now)
+             for i in range(existing, users)])
+        cursor.execute('SELECT COUNT(*) FROM posts_group')
+        existing = cursor.fetchone()[0]
+        cursor.executemany(
+            'INSERT INTO posts_group (title, slug, description, '
+            'posts_count, last_activity) VALUES (%s, %s, %s, 0, %s)',
+            [('Группа {0}'.format(i), 'group-{0}'.format(i), random_text(rnd),
+              now - timedelta(days=1))
+             for i in range(existing, groups)])
+        cursor.execute('SELECT MIN(id), MAX(id) FROM auth_user')
+        min_user, max_user = cursor.fetchone()
+        cursor.execute('SELECT MIN(id), MAX(id) FROM posts_group')
+        min_group, max_group = cursor.fetchone()
+        cursor.execute('SELECT COUNT(*) FROM posts_post')
+        existing = cursor.fetchone()[0]
+    for start in range(existing, posts, SEED_BATCH):
+        stop = min(start + SEED_BATCH, posts)
+        rows = [
+            (random_text(rnd, rnd.randint(10, 60)),
+             now - timedelta(seconds=posts - i),
+             rnd.randint(min_user, max_user),
+             rnd.choice((None, rnd.randint(min_group, max_group))))
+            for i in range(start, stop)
+        ]
+        with connection.cursor() as cursor, transaction.atomic():
+            cursor.executemany(
+                'INSERT INTO posts_post (text, pub_date, author_id, '
+                'group_id) VALUES (%s, %s, %s, %s)', rows)
+        print('Посты: {0}/{1}'.format(stop, posts), end='\r', flush=True)
+    if existing < posts:
+        print()
+        from django.core.management import call_command
+        call_command('reconcile_post_counters', verbosity=0,
+                     stdout=open(os.devnull, 'w'))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def measure(func, repeat=20):
+    """Выполняет func repeat раз и возвращает времена в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(timings, q):
+    """q-й перцентиль отсортированного списка времен."""
+    return timings[min(len(timings) - 1, int(len(timings) * q / 100))]
+
+
+def report(name, timings):
+    """Печатает медиану и 95-й перцентиль времени."""
+    timings = sorted(timings)
+    p95 = percentile(timings, 95)
+    print('{name:<40} median {median:9.2f} ms   p95 {p95:9.2f} ms'.format(
+        name=name, median=statistics.median(timings), p95=p95))
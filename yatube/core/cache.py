@@ -0,0 +1,81 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+STALE_KEY = 'stale:{key}'
+LOCK_KEY = 'stale:lock:{key}'
+# Интервал опроса кеша, пока значение пересчитывает другой процесс.
+WAIT_INTERVAL = 0.05
+
+
+def recompute_due(expires_at, delta, beta):
+    """
+    Пора ли пересчитать значение, пересчет которого занимает delta
+    секунд: после мягкого срока expires_at всегда, раньше - с
+    вероятностью, растущей к сроку (вероятностный ранний пересчет,
+    Vattani et al., XFetch). beta больше 1 пересчитывает раньше.
+    """
+    return time.time() - delta * beta * math.log(
+        1 - random.random()) >= expires_at
+
+
+def store(key, value, delta, timeout):
+    if timeout is None:
+        cache.set(STALE_KEY.format(key=key), (value, None, delta), None)
+        return
+    cache.set(
+        STALE_KEY.format(key=key),
+        (value, time.time() + timeout, delta),
+        timeout + settings.CACHE_STALE_TIMEOUT,
+    )
+
+
+def recompute(key, compute, timeout):
+    """Вычисляет значение, сохраняет его и возвращает."""
+    started = time.perf_counter()
+    value = compute()
+    store(key, value, time.perf_counter() - started, timeout)
+    return value
+
+
+def get_or_compute(key, compute, timeout):
+    """
+    Значение ключа key из кеша, при его отсутствии - результат
+    compute(), сохраненный на timeout секунд.
+
+    timeout - мягкий срок: значение хранится еще CACHE_STALE_TIMEOUT
+    секунд и отдается устаревшим, пока один процесс, взявший
+    блокировку, пересчитывает его. Незадолго до срока пересчет
+    начинается с растущей вероятностью, поэтому популярный ключ
+    обычно обновляется раньше, чем устареет. Если значения в кеше нет
+    совсем, остальные процессы до CACHE_LOCK_WAIT секунд ждут результат
+    взявшего блокировку и только потом считают сами.
+
+    Блокировка - cache.add, поэтому между процессами сервера она
+    действует только с общим кешем (SHARED_CACHE); с кешем в памяти
+    процесса каждый процесс пересчитывает значение сам.
+    """
+    entry = cache.get(STALE_KEY.format(key=key))
+    if entry is not None:
+        value, expires_at, delta = entry
+        if expires_at is None or not recompute_due(
+                expires_at, delta, settings.CACHE_EARLY_RECOMPUTE_BETA):
+            return value
+    lock = LOCK_KEY.format(key=key)
+    if cache.add(lock, True, settings.CACHE_LOCK_TIMEOUT):
+        try:
+            return recompute(key, compute, timeout)
+        finally:
+            cache.delete(lock)
+    if entry is not None:
+        return value
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(STALE_KEY.format(key=key))
+        if entry is not None:
+            return entry[0]
+    return recompute(key, compute, timeout)
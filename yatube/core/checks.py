@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Предупреждает, что кеш не общий для процессов сервера: сбросы
+    кеша страниц, лент и счетчиков и блокировки пересчета действуют
+    только в процессе, где они произошли.
+    """
+    if settings.SHARED_CACHE:
+        return []
+    return [Warning(
+        'Кеш хранится в памяти процесса.',
+        hint='Задайте адреса memcached в YATUBE_MEMCACHED, если сервер '
+             'работает в нескольких процессах.',
+        id='core.W001',
+    )]
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """
+    Копирует основную базу SQLite в файлы реплик из DATABASE_REPLICAS
+    через backup API SQLite. Заменяет репликацию при локальной
+    проверке чтения с реплик.
+    """
+    help = 'Копирует основную базу SQLite в реплики.'
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не включены: задайте YATUBE_DB_REPLICAS=1.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(
+                    'База {alias} - не SQLite.'.format(alias=alias))
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write('Скопировано в {alias}: {name}'.format(
+                alias=alias, name=replica.settings_dict['NAME']))
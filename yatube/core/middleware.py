@@ -0,0 +1,161 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.cache import get_conditional_response
+
+from posts.cache import PAGES_SCOPE, get_generation, make_etag
+
+from .timing import current_timings, start_timings, stop_timings
+
+logger = logging.getLogger('core.timing')
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет SQL-запросы, view и отрисовку шаблонов запроса и
+    отдает их в заголовке Server-Timing и строкой JSON в логгер
+    core.timing. Замеряется доля запросов SERVER_TIMING_SAMPLE_RATE.
+    Запросы, которые выполняет потоковый ответ уже после view,
+    не учитываются.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timings = start_timings()
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            stop_timings()
+        end = perf_counter()
+        view = end - timings.view_start if timings.view_start else 0.0
+        metrics = {
+            'db': (timings.sql, '{0} queries'.format(timings.queries)),
+            'view': (view - timings.template, None),
+            'tpl': (timings.template, None),
+            'total': (end - start, None),
+        }
+        response['Server-Timing'] = ', '.join(
+            '{0};dur={1}'.format(name, milliseconds(duration))
+            + (';desc="{0}"'.format(desc) if desc else '')
+            for name, (duration, desc) in metrics.items()
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timings.queries,
+            **{name + '_ms': milliseconds(duration)
+               for name, (duration, _) in metrics.items()},
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings()
+        if timings is not None:
+            timings.view_start = perf_counter()
+
+
+class PrimaryStickinessMiddleware:
+    """
+    После изменяющего запроса ставит клиенту куку
+    DATABASE_STICKY_COOKIE на DATABASE_STICKY_SECONDS: пока она есть,
+    view с replica_reads читают из основной базы, и редирект после
+    публикации поста не покажет отстающую реплику.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+                and settings.DATABASE_REPLICAS):
+            response.set_cookie(
+                settings.DATABASE_STICKY_COOKIE, '1',
+                max_age=settings.DATABASE_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+PAGE_CACHE_KEY = 'page:{generation}:{digest}'
+
+
+def cache_anonymous_page(view_func):
+    """
+    Отмечает view, ответы которого AnonymousPageCacheMiddleware
+    кеширует для анонимных посетителей.
+    """
+    view_func.cache_anonymous_page = True
+    return view_func
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    При PAGE_CACHE_ENABLED кеширует целиком страницы view, отмеченных
+    cache_anonymous_page, для посетителей без сессии, по адресу
+    и параметрам запроса. Ключ включает поколение PAGES_SCOPE, которое
+    меняют сигналы изменения постов, групп и имен авторов; чтобы
+    сброс дошел до всех процессов, кеш должен быть общим. Запросы
+    с кукой сессии или из PAGE_CACHE_BYPASS_COOKIES обходят кеш.
+    Ответ с Set-Cookie или CSRF-токеном не кешируется, поэтому
+    чужие токены и данные пользователя в кеш не попадают. Страницу,
+    которую предстоит сохранить, view с replica_reads читают
+    из основной базы.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, '_page_cache_key', None)
+        if key and self.is_cacheable(request, response):
+            cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (not settings.PAGE_CACHE_ENABLED
+                or not getattr(view_func, 'cache_anonymous_page', False)
+                or request.method not in ('GET', 'HEAD')
+                or settings.SESSION_COOKIE_NAME in request.COOKIES
+                or any(name in request.COOKIES
+                       for name in settings.PAGE_CACHE_BYPASS_COOKIES)):
+            return None
+        key = PAGE_CACHE_KEY.format(
+            generation=get_generation(PAGES_SCOPE),
+            digest=make_etag(request.get_host(), request.get_full_path()),
+        )
+        response = cache.get(key)
+        if response is None:
+            if request.method == 'GET':
+                request._page_cache_key = key
+            return None
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            response=response,
+        )
+
+    def is_cacheable(self, request, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+        )
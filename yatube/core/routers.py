@@ -0,0 +1,98 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Модели, чтения которых из лент и страниц постов можно отдать реплике.
+REPLICATED_MODELS = {'posts.post', 'posts.group', 'auth.user'}
+
+_local = threading.local()
+
+
+@contextmanager
+def read_from_replicas():
+    """
+    Разрешает в блоке читать REPLICATED_MODELS с реплик
+    из DATABASE_REPLICAS. Вне блока все запросы идут в основную базу.
+    """
+    previous = getattr(_local, 'replicas', False)
+    _local.replicas = True
+    try:
+        yield
+    finally:
+        _local.replicas = previous
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Запрещает в блоке чтение с реплик, в том числе внутри
+    read_from_replicas. Так читается все, что сохраняется в кеш
+    под текущим поколением данных: отстающая реплика закрепила бы
+    в нем устаревший результат до истечения срока кеша.
+    """
+    previous = getattr(_local, 'replicas', False)
+    _local.replicas = False
+    try:
+        yield
+    finally:
+        _local.replicas = previous
+
+
+def replica_read_count():
+    """Число чтений, отправленных маршрутизатором на реплики в потоке."""
+    return getattr(_local, 'replica_reads', 0)
+
+
+def replica_reads(view_func):
+    """
+    Выполняет view с чтением с реплик. Безопасные запросы клиента,
+    который недавно что-то изменил, читают из основной базы, чтобы
+    увидеть свои изменения (см. PrimaryStickinessMiddleware), как и
+    запрос, ответ на который AnonymousPageCacheMiddleware сохранит
+    в кеш страниц. Ответ, при отрисовке которого что-то прочитано
+    с реплики, отдается без ETag и Last-Modified: иначе клиент получал
+    бы 304 на устаревшую страницу и после того, как реплика догонит
+    основную базу.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or settings.DATABASE_STICKY_COOKIE in request.COOKIES
+                or getattr(request, '_page_cache_key', None)):
+            return view_func(request, *args, **kwargs)
+        reads = replica_read_count()
+        with read_from_replicas():
+            response = view_func(request, *args, **kwargs)
+        if replica_read_count() > reads and response.status_code == 200:
+            for header in ('ETag', 'Last-Modified'):
+                if response.has_header(header):
+                    del response[header]
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор чтения и записи: запись всегда идет в основную
+    базу, чтения REPLICATED_MODELS внутри read_from_replicas -
+    на случайную реплику.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (replicas and getattr(_local, 'replicas', False)
+                and model._meta.label_lower in REPLICATED_MODELS):
+            _local.replica_reads = replica_read_count() + 1
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, тоже сохраняется в основную базу.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии основной базы, связи между ними допустимы.
+        return True
@@ -0,0 +1,61 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def compress_gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики с хешем содержимого в именах файлов. После
+    collectstatic рядом с каждым текстовым файлом лежат сжатые копии
+    .gz и, если установлен brotli, .br: их отдают без сжатия
+    на каждый запрос.
+    """
+    compressed_extensions = ('.css', '.js', '.svg', '.ico', '.txt', '.map')
+    encodings = (
+        ('gzip', '.gz', compress_gzip),
+        ('br', '.br', compress_brotli if brotli else None),
+    )
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if os.path.splitext(name)[1] not in self.compressed_extensions:
+                continue
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    def compress(self, name):
+        """
+        Сохраняет сжатые копии файла name. Копия, которая не меньше
+        оригинала, не сохраняется. Возвращает имена сохраненных копий.
+        """
+        with self.open(name) as original:
+            content = original.read()
+        saved = []
+        for encoding, suffix, compress in self.encodings:
+            if compress is None:
+                continue
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            saved.append(self._save(name + suffix, ContentFile(compressed)))
+        return saved
@@ -0,0 +1,53 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.cache import get_or_compute
+from core.routers import read_from_primary
+
+register = template.Library()
+
+
+class StaleCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on],
+        )
+        return get_or_compute(
+            key, lambda: self.render_from_primary(context),
+            None if timeout is None else int(timeout))
+
+    def render_from_primary(self, context):
+        # Фрагмент хранится под поколением данных, поэтому читается
+        # из основной базы, а не с реплики, которая может отставать.
+        with read_from_primary():
+            return self.nodelist.render(context)
+
+
+@register.tag
+def cache(parser, token):
+    """
+    Замена {% cache %} с теми же аргументами, которая хранит фрагмент
+    через core.cache.get_or_compute: по истечении срока фрагмент
+    перерисовывает один запрос, остальные получают устаревший.
+    Фрагмент отрисовывается с чтением из основной базы.
+    """
+    nodelist = parser.parse(('endcache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            "'{0}' tag requires at least 2 arguments.".format(tokens[0]))
+    return StaleCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
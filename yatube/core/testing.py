@@ -0,0 +1,41 @@
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class query_budget(ContextDecorator):
+    """
+    Проверка бюджета SQL-запросов: блок кода или тест не должен
+    выполнить больше max_queries запросов. Работает и как контекстный
+    менеджер, и как декоратор:
+
+        with query_budget(2):
+            client.get('/')
+
+        @query_budget(5)
+        def test_index(self): ...
+    """
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.context)
+        if executed > self.max_queries:
+            queries = '\n'.join(
+                '%d. %s' % (number, query['sql'])
+                for number, query in enumerate(
+                    self.context.captured_queries, start=1))
+            raise AssertionError(
+                'Превышен бюджет запросов: выполнено %d из %d допустимых.'
+                '\n%s' % (executed, self.max_queries, queries))
+        return False
@@ -1,5 +1,35 @@
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
-from django.test import TestCase
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from core.cache import STALE_KEY, get_or_compute
+from core.middleware import AnonymousPageCacheMiddleware, cache_anonymous_page
 
 
 class ViewsTestClass(TestCase):
@@ -37,3 +67,441 @@ class ViewsTestClass(TestCase):
         """
 #        response = self.client.get('auth/login/')
 #        self.assertTemplateUsed(response, 'core/403csrf.html')
+
+
+class StaticPipelineTests(TestCase):
+    """
+    Класс используется для создания тестов сборки статики:
+    хешированных имен, сжатых копий и заголовков кеширования.
+    Статика собирается во временный каталог вне проекта.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.static_root = tempfile.mkdtemp()
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+        )
+        cls.static_settings.enable()
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        cls.static_settings.disable()
+        shutil.rmtree(cls.static_root, ignore_errors=True)
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """
+        Текстовые файлы получают хеш в имени и сжатые копии
+        с тем же содержимым, изображения не сжимаются.
+        """
+        name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        self.assertNotEqual(name, 'css/bootstrap.min.css')
+        with staticfiles_storage.open(name) as original:
+            content = original.read()
+        with staticfiles_storage.open(name + '.gz') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), content)
+        logo = staticfiles_storage.stored_name('img/logo.png')
+        self.assertFalse(staticfiles_storage.exists(logo + '.gz'))
+
+    @skipUnless(brotli, 'Brotli не установлен.')
+    def test_collectstatic_writes_brotli_copies(self):
+        """С установленным brotli текстовые файлы получают копию .br."""
+        name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        with staticfiles_storage.open(name) as original:
+            content = original.read()
+        with staticfiles_storage.open(name + '.br') as compressed:
+            self.assertEqual(brotli.decompress(compressed.read()), content)
+
+    def test_templates_use_hashed_static(self):
+        """Стили и иконки страниц подключаются из статики с хешем."""
+        response = self.client.get('/')
+        for name in ('css/bootstrap.min.css', 'img/fav/favicon.ico',
+                     'img/fav/favicon-32x32.png'):
+            with self.subTest(name=name):
+                self.assertContains(response, staticfiles_storage.url(name))
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+
+    def test_static_file_is_served_compressed_and_cached(self):
+        """
+        Файл с хешем отдается сжатой копией и кешируется надолго,
+        файл без хеша нужно перепроверять.
+        """
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        for accept, encoding in (
+                ('gzip, deflate, br', 'br' if brotli else 'gzip'),
+                ('gzip', 'gzip')):
+            with self.subTest(accept=accept):
+                response = self.client.get(
+                    url, HTTP_ACCEPT_ENCODING=accept)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(response['Content-Type'], 'text/css')
+                self.assertIn('Accept-Encoding', response['Vary'])
+                self.assertIn('immutable', response['Cache-Control'])
+                self.assertIn('max-age={0}'.format(
+                    settings.STATIC_CACHE_MAX_AGE), response['Cache-Control'])
+        response = self.client.get('/static/css/bootstrap.min.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get('/static/../manage.py')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class ServerTimingTests(TestCase):
+    """
+    Класс используется для создания тестов замеров запроса
+    в заголовке Server-Timing и в логе core.timing.
+    """
+    def test_timings_are_reported(self):
+        """
+        Заголовок и строка лога содержат число SQL-запросов
+        и время SQL, view, шаблонов и всего запроса.
+        """
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/about/author/')
+        header = response['Server-Timing']
+        for name in ('db', 'view', 'tpl', 'total'):
+            with self.subTest(name=name):
+                self.assertRegex(header, r'\b{0};dur=[\d.]+'.format(name))
+        self.assertIn('desc="{0} queries"'.format(len(queries)), header)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/about/author/')
+        self.assertEqual(record['status'], HTTPStatus.OK)
+        self.assertEqual(record['queries'], len(queries))
+        self.assertGreater(record['tpl_ms'], 0)
+        self.assertGreaterEqual(record['total_ms'], record['tpl_ms'])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        """Запросы вне выборки не замеряются."""
+        response = self.client.get('/about/author/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class SqlitePragmasTests(TestCase):
+    """
+    Класс используется для создания тестов настроек соединений
+    с SQLite из SQLITE_PRAGMAS.
+    """
+    def pragma(self, db_connection, name):
+        with db_connection.cursor() as cursor:
+            cursor.execute('PRAGMA {0}'.format(name))
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        """Соединение получает настройки из SQLITE_PRAGMAS."""
+        expected = {
+            'synchronous': 1,
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'temp_store': 2,
+        }
+        for name, value in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(self.pragma(connection, name), value)
+
+    def test_file_database_uses_wal(self):
+        """База в файле переводится в режим WAL."""
+        path = os.path.join(tempfile.mkdtemp(), 'wal.sqlite3')
+        file_connection = connections['default'].__class__(
+            {**connection.settings_dict, 'NAME': path}, alias='wal')
+        try:
+            self.assertEqual(
+                self.pragma(file_connection, 'journal_mode'), 'wal')
+        finally:
+            file_connection.close()
+            shutil.rmtree(os.path.dirname(path))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """
+    Класс используется для создания тестов чтения лент с реплики
+    и чтения своих изменений из основной базы. Реплика в тестах -
+    отдельная база, в которую ничего не реплицируется.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username='auth')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feeds_read_from_replica(self):
+        """Профиль и пост читаются с реплики, отстающей от основной."""
+        from posts.models import Post
+
+        post = Post.objects.create(
+            text='Пост в основной базе', author=self.user)
+        for address in ('/profile/auth/', '/posts/{0}/'.format(post.pk)):
+            with self.subTest(address=address):
+                response = self.client.get(address)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_cached_fragment_is_read_from_primary(self):
+        """
+        Фрагмент ленты, сохраняемый под текущим поколением, читается
+        из основной базы: пост, которого еще нет на реплике, виден
+        и не пропадет из кеша после ее синхронизации.
+        """
+        from posts.models import Post
+
+        Post.objects.create(text='Пост в основной базе', author=self.user)
+        response = self.client.get('/')
+        self.assertContains(response, 'Пост в основной базе')
+
+    def test_replica_response_has_no_validators(self):
+        """
+        Страница, прочитанная с реплики, отдается без ETag,
+        страница из основной базы - с ним.
+        """
+        from posts.models import Post
+
+        get_user_model().objects.db_manager('replica').create_user(
+            username='auth')
+        self.assertFalse(self.client.get('/profile/auth/').has_header('ETag'))
+        post = Post.objects.create(text='Пост', author=self.user)
+        with override_settings(DATABASE_REPLICAS=[]):
+            response = self.client.get('/posts/{0}/'.format(post.pk))
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_search_reads_from_primary(self):
+        """Поиск находит и показывает пост, которого нет на реплике."""
+        from posts.models import Post
+
+        Post.objects.create(text='Пост в основной базе', author=self.user)
+        response = self.client.get('/search/', {'q': 'основной'})
+        self.assertEqual(len(response.context['page_obj']), 1)
+        self.assertContains(response, 'основной')
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_page_cache_is_filled_from_primary(self):
+        """Страницу для кеша страниц view читает из основной базы."""
+        response = self.client.get('/profile/auth/')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_author_reads_own_writes(self):
+        """
+        Пост пишется в основную базу, и редирект после публикации
+        показывает его автору, хотя реплика еще пуста.
+        """
+        from posts.models import Post
+
+        response = self.authorized_client.post(
+            '/create/', {'text': 'Новый пост'}, follow=True)
+        self.assertContains(response, 'Новый пост')
+        self.assertEqual(Post.objects.using('default').count(), 1)
+        self.assertEqual(Post.objects.using('replica').count(), 0)
+        response = Client().get('/profile/auth/')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTests(TestCase):
+    """
+    Класс используется для создания тестов кеша страниц для анонимных
+    посетителей: повторных показов без запросов к базе, обхода кеша
+    с сессией и сброса при изменении постов.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = get_user_model().objects.create_user(username='auth')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_repeat_view_skips_database(self):
+        """Повторный показ страницы анонимному посетителю идет из кеша."""
+        for address in ('/', '/profile/auth/'):
+            with self.subTest(address=address):
+                first = self.client.get(address)
+                with self.assertNumQueries(0):
+                    response = self.client.get(address)
+                self.assertEqual(response.content, first.content)
+
+    def test_cached_page_answers_conditional_get(self):
+        """Закешированная страница отвечает 304 на совпавший ETag."""
+        first = self.client.get('/')
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_session_bypasses_cache(self):
+        """Вошедший пользователь видит свою страницу, а не чужую из кеша."""
+        self.client.get('/')
+        response = self.authorized_client.get('/')
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'auth')
+
+    def test_new_post_invalidates_pages(self):
+        """Новый пост сразу виден в закешированных страницах."""
+        self.client.get('/')
+        self.client.get('/profile/auth/')
+        from posts.models import Post
+
+        Post.objects.create(text='Свежий пост после кеша', author=self.user)
+        for address in ('/', '/profile/auth/'):
+            with self.subTest(address=address):
+                self.assertContains(
+                    self.client.get(address), 'Свежий пост после кеша')
+
+    def test_signup_keeps_and_rename_refreshes_pages(self):
+        """
+        Регистрация не сбрасывает закешированные страницы, новое имя
+        автора сразу видно на них.
+        """
+        self.client.get('/')
+        get_user_model().objects.create_user(username='newcomer')
+        with self.assertNumQueries(0):
+            self.client.get('/')
+        from posts.models import Post
+
+        Post.objects.create(text='Пост автора', author=self.user)
+        self.client.get('/')
+        author = get_user_model().objects.get(pk=self.user.pk)
+        author.first_name = 'Новое'
+        author.last_name = 'Имя'
+        author.save()
+        self.assertContains(self.client.get('/'), 'Новое Имя')
+
+    def test_response_with_cookies_is_not_cached(self):
+        """Ответ с CSRF-токеном или Set-Cookie в кеш не попадает."""
+        @cache_anonymous_page
+        def view(request):
+            return HttpResponse(get_token(request))
+
+        def get_response(request):
+            response = view(request)
+            response.set_cookie('csrftoken', response.content.decode())
+            return response
+
+        middleware = AnonymousPageCacheMiddleware(get_response)
+        for _ in range(2):
+            request = RequestFactory().get('/token/')
+            self.assertIsNone(middleware.process_view(request, view, (), {}))
+            middleware(request)
+
+
+class StaleCacheTests(TestCase):
+    """
+    Класс используется для создания тестов get_or_compute: при истечении
+    срока и при пустом кеше значение пересчитывает один поток.
+    """
+    threads = 8
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def compute(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return 'новое'
+
+    def get_concurrently(self, key):
+        barrier = threading.Barrier(self.threads)
+
+        def get(_):
+            barrier.wait()
+            return get_or_compute(key, self.compute, 60)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            return list(executor.map(get, range(self.threads)))
+
+    def test_expired_value_is_recomputed_once(self):
+        """
+        Истекшее значение пересчитывает один поток, остальные сразу
+        получают устаревшее.
+        """
+        cache.set(STALE_KEY.format(key='hot'),
+                  ('старое', time.time() - 1, 0.0), 60)
+        results = self.get_concurrently('hot')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results.count('новое'), 1)
+        self.assertEqual(results.count('старое'), self.threads - 1)
+        self.assertEqual(get_or_compute('hot', self.compute, 60), 'новое')
+
+    def test_missing_value_is_computed_once(self):
+        """Отсутствующее значение считает один поток, остальные ждут."""
+        results = self.get_concurrently('cold')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['новое'] * self.threads)
+
+    def test_slow_value_is_recomputed_early(self):
+        """
+        Значение, которое долго считать, пересчитывается до срока,
+        быстрое - нет.
+        """
+        for delta, calls in ((10.0, 1), (0.0, 0)):
+            with self.subTest(delta=delta):
+                self.calls = 0
+                cache.set(STALE_KEY.format(key='soon'),
+                          ('старое', time.time() + 1, delta), 60)
+                with mock.patch('core.cache.random.random',
+                                return_value=0.5):
+                    get_or_compute('soon', self.compute, 60)
+                self.assertEqual(self.calls, calls)
+
+
+# Процесс ждет общего момента старта и берет значение через
+# get_or_compute; пересчет увеличивает общий счетчик в кеше. shell -c
+# выполняет код в локальном пространстве имен, поэтому compute
+# импортирует нужное сам.
+COMPUTE_IN_PROCESS = """
+import time
+from core.cache import get_or_compute
+
+def compute():
+    import time
+    from django.core.cache import cache
+    cache.incr('{counter}')
+    time.sleep(1)
+    return 'новое'
+
+time.sleep(max(0, {start_at} - time.time()))
+print(get_or_compute('{key}', compute, 60))
+"""
+
+
+@skipUnless(settings.SHARED_CACHE, 'Нужен общий кеш (YATUBE_MEMCACHED).')
+class SharedStaleCacheTests(TestCase):
+    """
+    Класс используется для создания теста get_or_compute в нескольких
+    процессах с общим кешем: блокировка пересчета действует между ними.
+    """
+    processes = 4
+
+    def test_value_is_computed_once_across_processes(self):
+        """Одновременно запрошенное значение считает один процесс."""
+        key = 'shared-{0}'.format(uuid.uuid4().hex)
+        counter = key + ':calls'
+        cache.set(counter, 0, 60)
+        script = COMPUTE_IN_PROCESS.format(
+            key=key, counter=counter, start_at=time.time() + 5)
+        workers = [
+            subprocess.Popen(
+                [sys.executable, 'manage.py', 'shell', '-c', script],
+                cwd=settings.BASE_DIR, stdout=subprocess.PIPE,
+                env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+            for _ in range(self.processes)
+        ]
+        results = [
+            worker.communicate(timeout=60)[0].decode().strip()
+            for worker in workers
+        ]
+        self.assertEqual(cache.get(counter), 1)
+        self.assertEqual(results, ['новое'] * self.processes)
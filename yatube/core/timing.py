@@ -0,0 +1,72 @@
+import threading
+from time import perf_counter
+
+from django.template.backends import django as django_backend
+
+_local = threading.local()
+
+
+class RequestTimings:
+    """
+    Замеры одного запроса: число и время SQL-запросов, время
+    отрисовки шаблонов и начало view. Время хранится в секундах.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.view_start = None
+        self.render_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обертка connection.execute_wrapper: считает SQL-запросы."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql += perf_counter() - start
+
+
+def start_timings():
+    """Начинает замеры для запроса текущего потока."""
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def stop_timings():
+    _local.timings = None
+
+
+def current_timings():
+    """Замеры запроса текущего потока или None вне запроса."""
+    return getattr(_local, 'timings', None)
+
+
+class Template(django_backend.Template):
+    """Шаблон, время отрисовки которого учитывается в замерах запроса."""
+    def render(self, context=None, request=None):
+        timings = current_timings()
+        if timings is None:
+            return super().render(context, request)
+        # Шаблоны, отрисованные внутри другого шаблона, уже учтены.
+        timings.render_depth += 1
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.render_depth -= 1
+            if not timings.render_depth:
+                timings.template += perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Бэкенд шаблонов Django с замером времени отрисовки."""
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except django_backend.TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
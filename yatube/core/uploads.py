@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загружаемый файл во временный файл частями. Данные сверх
+    UPLOAD_MAX_SIZE отбрасываются, но учитываются в размере файла,
+    чтобы форма отклонила его с понятной ошибкой.
+    """
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.UPLOAD_MAX_SIZE:
+            return None
+        return super().receive_data_chunk(raw_data, start)
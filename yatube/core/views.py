@@ -1,6 +1,19 @@
-from django.shortcuts import render
+import mimetypes
+import os
+import re
 from http import HTTPStatus
 
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
 
 def page_not_found(request, exception):
     """
@@ -19,3 +32,53 @@ def csrf_failure(request, reason=''):
     не был отправлен csrf-токен.
     """
     return render(request, 'core/403csrf.html')
+
+
+def accepted_encodings(request):
+    """Кодировки из заголовка Accept-Encoding запроса."""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return {
+        value.split(';')[0].strip()
+        for value in re.split(r',\s*', header.lower())
+        if not value.endswith(';q=0')
+    }
+
+
+@require_safe
+def static_file(request, path):
+    """
+    Отдает файл статики, собранный collectstatic в STATIC_ROOT, когда
+    перед приложением нет веб-сервера. Если клиент принимает сжатие,
+    отдается заранее сжатая копия. Файлы с хешем содержимого в имени
+    кешируются браузером на STATIC_CACHE_MAX_AGE, остальные нужно
+    перепроверять.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    encodings = accepted_encodings(request)
+    content_encoding = None
+    for encoding, suffix in STATIC_ENCODINGS:
+        if encoding in encodings and os.path.isfile(full_path + suffix):
+            full_path += suffix
+            content_encoding = encoding
+            break
+    response = FileResponse(
+        open(full_path, 'rb'),
+        content_type=(
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'),
+    )
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    if path in hashed_files.values():
+        patch_cache_control(
+            response, public=True, immutable=True,
+            max_age=settings.STATIC_CACHE_MAX_AGE)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,199 @@
+import json
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET
+
+from .cache import feed_scope, get_generation, make_etag
+from .models import Post
+from .paginators import InvalidCursor, cursor_queryset, encode_cursor
+from .views import get_author, get_group
+
+# Поля постов в API и соответствующие им выражения для values().
+API_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+FEED_ORDERING = tuple(Post._meta.ordering)
+CURSOR_KEYS = tuple(name.lstrip('-') for name in FEED_ORDERING)
+
+
+class ApiError(Exception):
+    """Ошибка в параметрах запроса к API."""
+    pass
+
+
+def api_view(view):
+    """
+    Обертка представлений API: только GET, ошибки параметров и 404
+    отдаются в JSON.
+    """
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse(
+                {'detail': str(error)}, status=HTTPStatus.BAD_REQUEST)
+        except Http404:
+            return JsonResponse(
+                {'detail': 'Не найдено.'}, status=HTTPStatus.NOT_FOUND)
+    return wrapper
+
+
+def get_fields(request):
+    """Запрошенные поля из параметра fields= (по умолчанию все)."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(API_FIELDS)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown or not fields:
+        raise ApiError('Неизвестные поля: {fields}. Доступны: {known}.'.format(
+            fields=', '.join(unknown), known=', '.join(API_FIELDS)))
+    return fields
+
+
+def get_limit(request):
+    """Размер страницы из параметра limit=."""
+    raw = request.GET.get('limit')
+    if raw is None:
+        return settings.COUNT_PER_PAGE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ApiError('Параметр limit должен быть числом.')
+    if not 1 <= limit <= settings.API_MAX_PAGE_SIZE:
+        raise ApiError('Параметр limit должен быть от 1 до {max}.'.format(
+            max=settings.API_MAX_PAGE_SIZE))
+    return limit
+
+
+def to_json(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def serialize_row(row, fields):
+    """Строка values() в JSON-объект поста с запрошенными полями."""
+    return to_json({field: row[API_FIELDS[field]] for field in fields})
+
+
+def row_cursor(row):
+    return encode_cursor([row[key] for key in CURSOR_KEYS])
+
+
+def stream_feed(rows, fields, limit, has_next, has_previous):
+    """
+    Генератор JSON-ответа ленты. Строки сериализуются по одной,
+    курсоры страниц записываются после списка постов. Лишняя строка
+    сверх limit означает, что есть следующая страница.
+    """
+    yield '{"results":['
+    first = last = None
+    for number, row in enumerate(rows):
+        if number == limit:
+            has_next = True
+            break
+        if first is None:
+            first = row
+        else:
+            yield ','
+        last = row
+        yield serialize_row(row, fields)
+    yield '],"next":{next},"previous":{previous}}}'.format(
+        next=to_json(row_cursor(last) if has_next and last else None),
+        previous=to_json(
+            row_cursor(first) if has_previous and first else None),
+    )
+
+
+def feed_response(request, post_list):
+    """
+    Потоковый JSON-ответ со страницей ленты post_list. Страницы
+    адресуются курсорами ?after=/?before= как и в HTML-лентах.
+    """
+    fields = get_fields(request)
+    limit = get_limit(request)
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    try:
+        queryset = cursor_queryset(
+            post_list, FEED_ORDERING, after=after, before=before)
+    except InvalidCursor as error:
+        raise ApiError(str(error))
+    columns = {API_FIELDS[field] for field in fields} | set(CURSOR_KEYS)
+    rows = queryset.values(*columns)[:limit + 1]
+    if before:
+        # Страница перед курсором выбирается в обратном порядке
+        # и разворачивается; она ограничена limit строками.
+        rows = list(rows)
+        has_previous = len(rows) > limit
+        rows = rows[:limit][::-1]
+        content = stream_feed(rows, fields, limit, True, has_previous)
+    else:
+        content = stream_feed(
+            rows.iterator(), fields, limit, False, bool(after))
+    return StreamingHttpResponse(content, content_type='application/json')
+
+
+def api_etag(request, scope):
+    """ETag ответа API: полный адрес запроса и поколение ленты."""
+    return make_etag(
+        'api', request.get_full_path(), get_generation(scope))
+
+
+def index_etag(request):
+    return api_etag(request, feed_scope('index'))
+
+
+def group_posts_etag(request, slug):
+    return api_etag(request, feed_scope('group', get_group(request, slug).pk))
+
+
+def profile_etag(request, username):
+    return api_etag(
+        request, feed_scope('profile', get_author(request, username).pk))
+
+
+@api_view
+@condition(etag_func=index_etag)
+def index(request):
+    """Лента всех постов в JSON."""
+    return feed_response(request, Post.objects.feed())
+
+
+@api_view
+@condition(etag_func=group_posts_etag)
+def group_posts(request, slug):
+    """Лента постов группы в JSON."""
+    group = get_group(request, slug)
+    return feed_response(request, Post.objects.feed().filter(group=group))
+
+
+@api_view
+@condition(etag_func=profile_etag)
+def profile(request, username):
+    """Лента постов автора в JSON."""
+    author = get_author(request, username)
+    return feed_response(request, Post.objects.feed().filter(author=author))
+
+
+@api_view
+def post_detail(request, post_id):
+    """Пост в JSON."""
+    fields = get_fields(request)
+    row = Post.objects.filter(pk=post_id).values(
+        *{API_FIELDS[field] for field in fields}).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(
+        {field: row[API_FIELDS[field]] for field in fields},
+        json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,73 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+GENERATION_KEY = 'posts:generation:{scope}'
+FEED_SCOPE = 'feed:{feed}:{scope_id}'
+# Область, поколение которой меняется при любом изменении постов.
+POSTS_SCOPE = 'posts'
+# Область страниц, целиком закешированных для анонимных посетителей.
+PAGES_SCOPE = 'pages'
+
+
+def new_generation():
+    """
+    Начальный номер поколения. Берется из текущего времени, чтобы
+    после вытеснения ключа поколения из кеша не вернуться к номеру,
+    под которым еще лежат устаревшие записи.
+    """
+    return int(time.time() * 1000)
+
+
+def get_generation(scope=POSTS_SCOPE):
+    """
+    Возвращает номер поколения данных области scope. Номер входит
+    в ключи кеша, поэтому его смена делает старые записи недоступными.
+    """
+    return cache.get_or_set(
+        GENERATION_KEY.format(scope=scope), new_generation, None)
+
+
+def bump_generation(scope=POSTS_SCOPE):
+    """Сменяет поколение области scope, сбрасывая ее кеш."""
+    key = GENERATION_KEY.format(scope=scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_generation(), None)
+
+
+def feed_scope(feed, scope_id=None):
+    """Область кеша ленты: главной, группы или профиля автора."""
+    return FEED_SCOPE.format(feed=feed, scope_id=scope_id or '')
+
+
+def feed_cache_key(request, feed, scope_id=None):
+    """
+    Ключ фрагмента ленты: тип ленты, идентификатор группы или автора,
+    запрошенная страница и текущее поколение области ленты.
+    """
+    return ':'.join(str(part) for part in (
+        feed,
+        scope_id or '',
+        request.GET.get('page', ''),
+        request.GET.get('after', ''),
+        request.GET.get('before', ''),
+        get_generation(feed_scope(feed, scope_id)),
+    ))
+
+
+def make_etag(*parts):
+    """Короткий ETag из частей, от которых зависит страница."""
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def feed_etag(request, feed, scope_id=None):
+    """
+    ETag страницы ленты без ее отрисовки: ключ фрагмента ленты
+    и пользователь, для которого отрисована шапка страницы.
+    """
+    return make_etag(
+        request.user.pk or 0, feed_cache_key(request, feed, scope_id))
@@ -0,0 +1,146 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import quote_etag
+from django.utils.text import Truncator
+
+from core.cache import get_or_compute
+
+from .cache import feed_scope, get_generation, make_etag
+from .models import Post
+from .views import get_author, get_group
+
+SYNDICATION_KEY = 'posts:syndication:{etag}'
+TITLE_WORDS = 8
+
+
+class CachedPostsFeed(Feed):
+    """
+    RSS-лента последних постов. Посты выбираются через iterator()
+    без кеша queryset, готовый ответ хранится в кеше по поколению
+    области ленты, а ETag позволяет отвечать 304 без выборки постов.
+    """
+    feed = 'index'
+    title = 'YaTube Последние обновления на сайте'
+    description = 'Последние посты всех авторов YaTube.'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def get_scope_id(self, request, *args, **kwargs):
+        """Идентификатор группы или автора ленты."""
+        return None
+
+    def get_post_list(self, obj):
+        return Post.objects.feed()
+
+    def items(self, obj):
+        return self.get_post_list(obj)[:settings.SYNDICATION_ITEMS].iterator()
+
+    def item_title(self, item):
+        return Truncator(item.text).words(TITLE_WORDS)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def get_etag(self, request, *args, **kwargs):
+        scope = feed_scope(
+            self.feed, self.get_scope_id(request, *args, **kwargs))
+        return make_etag(
+            'syndication', self.feed_type.__name__,
+            request.build_absolute_uri(), get_generation(scope))
+
+    def __call__(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=quote_etag(etag))
+        if response is not None:
+            return response
+        response = get_or_compute(
+            SYNDICATION_KEY.format(etag=etag),
+            partial(super().__call__, request, *args, **kwargs),
+            settings.FEED_CACHE_TIMEOUT,
+        )
+        response['ETag'] = quote_etag(etag)
+        return response
+
+
+class GroupPostsFeed(CachedPostsFeed):
+    """RSS-лента постов группы."""
+    feed = 'group'
+
+    def get_object(self, request, slug):
+        return get_group(request, slug)
+
+    def get_scope_id(self, request, slug):
+        return get_group(request, slug).pk
+
+    def title(self, obj):
+        return 'Записи сообщества {group}'.format(group=obj)
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', kwargs={'slug': obj.slug})
+
+    def get_post_list(self, obj):
+        return Post.objects.feed().filter(group=obj)
+
+
+class ProfilePostsFeed(CachedPostsFeed):
+    """RSS-лента постов автора."""
+    feed = 'profile'
+
+    def get_object(self, request, username):
+        return get_author(request, username)
+
+    def get_scope_id(self, request, username):
+        return get_author(request, username).pk
+
+    def title(self, obj):
+        return 'Все посты пользователя {author}'.format(author=obj)
+
+    def description(self, obj):
+        return self.title(obj)
+
+    def link(self, obj):
+        return reverse('posts:profile', kwargs={'username': obj.username})
+
+    def get_post_list(self, obj):
+        return Post.objects.feed().filter(author=obj)
+
+
+class AtomFeedMixin:
+    """Отдает ленту в формате Atom вместо RSS."""
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class AtomPostsFeed(AtomFeedMixin, CachedPostsFeed):
+    pass
+
+
+class AtomGroupPostsFeed(AtomFeedMixin, GroupPostsFeed):
+    pass
+
+
+class AtomProfilePostsFeed(AtomFeedMixin, ProfilePostsFeed):
+    pass
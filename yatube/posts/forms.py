@@ -1,20 +1,58 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
 from .models import Post
 
 
+class PostImageField(forms.ImageField):
+    """
+    Поле изображения поста с ограничением размера файла и сторон.
+    Размер проверяется до разбора файла: загрузка сверх UPLOAD_MAX_SIZE
+    записана на диск не полностью.
+    """
+    default_error_messages = {
+        'file_too_large': 'Файл больше %(limit)s.',
+        'image_too_large': (
+            'Изображение больше %(limit)s пикселей по одной из сторон.'),
+    }
+
+    def to_python(self, data):
+        if data and data.size > settings.UPLOAD_MAX_SIZE:
+            raise forms.ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'limit': filesizeformat(settings.UPLOAD_MAX_SIZE)},
+            )
+        image_file = super().to_python(data)
+        if image_file is not None:
+            limit = settings.POST_IMAGE_MAX_DIMENSION
+            if max(image_file.image.size) > limit:
+                raise forms.ValidationError(
+                    self.error_messages['image_too_large'],
+                    code='image_too_large',
+                    params={'limit': limit},
+                )
+        return image_file
+
+
 class PostForm(forms.ModelForm):
     """
     Класс для создания формы, предназначенной для создания нового поста.
     """
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
+        field_classes = {
+            'image': PostImageField,
+        }
         labels = {
             'text': 'Текст поста',
             'group': 'Выбрать группу',
+            'image': 'Картинка',
         }
         help_texts = {
             'text': 'Текст нового поста',
             'group': 'Группа, к которой будет относиться пост',
+            'image': 'Изображение к посту',
         }
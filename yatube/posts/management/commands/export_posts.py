@@ -0,0 +1,239 @@
+import bz2
+import csv
+import datetime
+import gzip
+import io
+import json
+import lzma
+import os
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from posts.models import Group, Post
+from posts.paginators import keyset_filter
+
+User = get_user_model()
+FORMATS = ('jsonl', 'csv')
+# Виды записей в порядке выгрузки: авторы и группы раньше постов,
+# которые на них ссылаются.
+RECORDS = ('users', 'groups', 'posts')
+# Значение поля type записи в JSONL.
+RECORD_TYPES = {'users': 'user', 'groups': 'group', 'posts': 'post'}
+COMPRESSORS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+# Столбцы выгрузки совпадают с полями записей import_posts. Пароли
+# пользователей не выгружаются.
+COLUMNS = {
+    'users': (
+        'id', 'username', 'first_name', 'last_name', 'date_joined',
+        'is_active',
+    ),
+    'groups': ('id', 'slug', 'title', 'description', 'last_activity'),
+    'posts': ('id', 'text', 'author', 'group', 'pub_date', 'updated_at'),
+}
+FIELDS = dict(COLUMNS, posts=(
+    'id', 'text', 'author__username', 'group__slug', 'pub_date', 'updated_at',
+))
+ORDERING = ('pk',)
+
+
+def parse_moment(value):
+    """Дата или дата и время из аргумента командной строки."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError('Некорректная дата: {value}.'.format(
+                value=value))
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_value(value):
+    """Даты выгружаются в ISO 8601 без потери микросекунд."""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_rows(queryset, fields, batch_size):
+    """
+    Строки values_list(*fields) в порядке pk. Каждая пачка выбирается
+    отдельным запросом по ключу последней строки, поэтому в памяти
+    находится не больше batch_size строк.
+    """
+    last = None
+    while True:
+        page = queryset.order_by(*ORDERING)
+        if last is not None:
+            page = page.filter(keyset_filter(ORDERING, [last]))
+        rows = list(page.values_list(*fields)[:batch_size])
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1][0]
+
+
+class Command(BaseCommand):
+    """
+    Выгружает пользователей, группы и посты в JSONL или CSV,
+    при необходимости сжатые, в файл или на стандартный вывод.
+    В JSONL каждая запись помечена полем type, в CSV выгружается
+    один вид записей. Записи читаются пачками по ключу, поэтому
+    расход памяти не зависит от размера таблиц.
+    """
+    help = 'Выгружает пользователей, группы и посты в файл JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='-',
+            help='Файл выгрузки; "-" - стандартный вывод.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат выгрузки; по умолчанию по расширению или jsonl.',
+        )
+        parser.add_argument(
+            '--compress',
+            choices=COMPRESSORS,
+            help='Сжатие; по умолчанию по расширению файла.',
+        )
+        parser.add_argument(
+            '--records',
+            action='append',
+            choices=RECORDS,
+            help='Вид записей, можно несколько раз; по умолчанию все '
+                 'для JSONL и posts для CSV.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одном запросе.',
+        )
+        parser.add_argument(
+            '--author', help='Username автора: он и его посты.')
+        parser.add_argument(
+            '--group', help='Slug группы: она и ее посты.')
+        parser.add_argument(
+            '--since', type=parse_moment,
+            help='Посты, опубликованные не раньше даты.')
+        parser.add_argument(
+            '--until', type=parse_moment,
+            help='Посты, опубликованные раньше даты.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть больше нуля.')
+        name, suffix = os.path.splitext(path)
+        compress = options['compress'] or SUFFIXES.get(suffix)
+        if compress and suffix in SUFFIXES:
+            path_format = os.path.splitext(name)[1]
+        else:
+            path_format = suffix
+        file_format = options['format'] or path_format.lstrip('.')
+        if file_format not in FORMATS:
+            file_format = 'jsonl'
+        records = options['records'] or (
+            ['posts'] if file_format == 'csv' else RECORDS)
+        records = [kind for kind in RECORDS if kind in records]
+        if file_format == 'csv' and len(records) > 1:
+            raise CommandError(
+                'В CSV выгружается один вид записей, укажите --records.')
+        querysets = {
+            'users': self.filter_users(User.objects.all(), options),
+            'groups': self.filter_groups(Group.objects.all(), options),
+            'posts': self.filter_posts(Post.objects.all(), options),
+        }
+        exported = Counter()
+        started = time.monotonic()
+        stream = self.open_stream(path, compress)
+        try:
+            for kind in records:
+                rows = iter_rows(
+                    querysets[kind], FIELDS[kind], options['batch_size'])
+                if file_format == 'csv':
+                    exported[kind] = self.write_csv(
+                        stream, COLUMNS[kind], rows)
+                else:
+                    exported[kind] = self.write_jsonl(stream, kind, rows)
+        finally:
+            if stream is self.stdout:
+                stream.flush()
+            else:
+                stream.close()
+        elapsed = time.monotonic() - started
+        total = sum(exported.values())
+        self.stderr.write(self.style.SUCCESS(
+            'Выгружено пользователей: {users}, групп: {groups}, '
+            'постов: {posts}, {rate:.0f} записей/с.'.format(
+                rate=total / elapsed if elapsed else 0,
+                **{kind: exported[kind] for kind in RECORDS})))
+
+    def filter_users(self, queryset, options):
+        if options['author']:
+            queryset = queryset.filter(username=options['author'])
+        return queryset
+
+    def filter_groups(self, queryset, options):
+        if options['group']:
+            queryset = queryset.filter(slug=options['group'])
+        return queryset
+
+    def filter_posts(self, queryset, options):
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        if options['group']:
+            queryset = queryset.filter(group__slug=options['group'])
+        if options['since']:
+            queryset = queryset.filter(pub_date__gte=options['since'])
+        if options['until']:
+            queryset = queryset.filter(pub_date__lt=options['until'])
+        return queryset
+
+    def open_stream(self, path, compress):
+        """Текстовый поток для записи, сжатый при необходимости."""
+        if path == '-':
+            if not compress:
+                return self.stdout
+            if not hasattr(self.stdout, 'buffer'):
+                raise CommandError(
+                    'Сжатая выгрузка требует двоичного стандартного вывода.')
+            return io.TextIOWrapper(
+                COMPRESSORS[compress](self.stdout.buffer, 'wb'),
+                encoding='utf-8', newline='')
+        if compress:
+            return COMPRESSORS[compress](
+                path, 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    def write_jsonl(self, stream, kind, rows):
+        exported = 0
+        for row in rows:
+            record = {'type': RECORD_TYPES[kind]}
+            record.update(zip(COLUMNS[kind], map(export_value, row)))
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            exported += 1
+        return exported
+
+    def write_csv(self, stream, columns, rows):
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        exported = 0
+        for row in rows:
+            writer.writerow(map(export_value, row))
+            exported += 1
+        return exported
@@ -0,0 +1,375 @@
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import bump_generation, feed_scope
+from posts.models import Group, Post
+from posts.signals import (change_author_count, change_group_count,
+                           invalidate_posts_cache, touch_group)
+from posts.timeline import fan_out_posts
+
+User = get_user_model()
+FORMATS = ('jsonl', 'csv')
+
+
+def insert_posts(posts):
+    """
+    Вставляет посты одним executemany с датами из самих объектов.
+    bulk_create перезаписал бы pub_date и updated_at текущим временем
+    (auto_now_add, auto_now), а исправлять их отдельным UPDATE
+    по каждой строке дольше самой вставки. pk постам не проставляются,
+    как и bulk_create на SQLite.
+    """
+    quote_name = connection.ops.quote_name
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not field.primary_key
+    ]
+    sql = 'INSERT INTO {table} ({columns}) VALUES ({values})'.format(
+        table=quote_name(Post._meta.db_table),
+        columns=', '.join(quote_name(field.column) for field in fields),
+        values=', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            [field.get_db_prep_save(getattr(post, field.attname), connection)
+             for field in fields]
+            for post in posts
+        ])
+
+
+class RelationCache:
+    """
+    Кеш идентификаторов авторов или групп по ключу (username или slug).
+    Недостающие ключи запрашиваются одним запросом на пачку записей,
+    отсутствующие в базе запоминаются как None.
+    """
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.ids = {}
+
+    def load(self, keys):
+        missing = {
+            key for key in keys
+            if isinstance(key, str) and key and key not in self.ids
+        }
+        if not missing:
+            return
+        self.ids.update(dict.fromkeys(missing))
+        self.ids.update(self.queryset.filter(**{
+            self.field + '__in': missing,
+        }).values_list(self.field, 'pk').iterator())
+
+    def get(self, key):
+        return self.ids.get(key) if isinstance(key, str) else None
+
+    def forget(self, keys):
+        """Забывает ключи, чтобы следующий load() запросил их заново."""
+        for key in keys:
+            self.ids.pop(key, None)
+
+
+def record_type(record):
+    """Тип записи выгрузки export_posts; записи без типа - посты."""
+    if isinstance(record, dict):
+        return record.get('type', 'post')
+    return 'post'
+
+
+def parse_record_date(value, message):
+    """Дата ISO 8601 из записи; ValidationError(message) для неверной."""
+    moment = parse_datetime(str(value))
+    if moment is None:
+        raise ValidationError(message)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    """
+    Импортирует посты из JSONL или CSV пачками через executemany.
+    Каждая запись содержит text, author (username), необязательные
+    group (slug) и pub_date (ISO 8601). Записи JSONL с type user
+    и group из выгрузки export_posts создают отсутствующих
+    пользователей (без пароля) и группы. Номер последней сохраненной
+    записи пишется в файл контрольной точки, поэтому прерванный импорт
+    продолжается с места остановки.
+    """
+    help = 'Импортирует посты из файла JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='-',
+            help='Файл с постами; "-" - стандартный ввод.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество постов в одной транзакции.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки для продолжения импорта.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self.guess_format(path)
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('Размер пачки должен быть больше нуля.')
+        checkpoint = options['checkpoint']
+        done = self.read_checkpoint(checkpoint)
+        self.authors = RelationCache(User.objects.all(), 'username')
+        self.groups = RelationCache(Group.objects.all(), 'slug')
+        self.text_field = Post._meta.get_field('text')
+        imported = skipped = 0
+        self.created = Counter()
+        started = time.monotonic()
+        stream = sys.stdin if path == '-' else open(
+            path, encoding='utf-8', newline='')
+        try:
+            records = enumerate(self.read_records(stream, file_format), 1)
+            records = islice(records, done, None)
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                saved, failed = self.import_batch(batch)
+                imported += saved
+                skipped += failed
+                done = batch[-1][0]
+                self.write_checkpoint(checkpoint, done)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    'Записей: {done}, импортировано: {imported}, '
+                    '{rate:.0f} постов/с'.format(
+                        done=done, imported=imported,
+                        rate=imported / elapsed if elapsed else 0))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if any(self.created.values()):
+            self.stdout.write(
+                'Создано пользователей: {users}, групп: {groups}.'.format(
+                    users=self.created['users'],
+                    groups=self.created['groups']))
+        self.stdout.write(self.style.SUCCESS(
+            'Импортировано постов: {imported}, пропущено: {skipped}.'.format(
+                imported=imported, skipped=skipped)))
+
+    def guess_format(self, path):
+        extension = os.path.splitext(path)[1].lstrip('.').lower()
+        if extension in FORMATS:
+            return extension
+        if extension == 'json':
+            return 'jsonl'
+        raise CommandError('Укажите формат файла параметром --format.')
+
+    def read_records(self, stream, file_format):
+        """Записи файла по одной, без чтения файла целиком."""
+        if file_format == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+    def read_checkpoint(self, checkpoint):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as checkpoint_file:
+            try:
+                return int(checkpoint_file.read().strip() or 0)
+            except ValueError:
+                raise CommandError(
+                    'Некорректный файл контрольной точки.')
+
+    def write_checkpoint(self, checkpoint, done):
+        """Атомарно записывает номер последней сохраненной записи."""
+        if not checkpoint:
+            return
+        temporary = checkpoint + '.tmp'
+        with open(temporary, 'w') as checkpoint_file:
+            checkpoint_file.write(str(done))
+        os.replace(temporary, checkpoint)
+
+    def build_post(self, record):
+        """Пост из записи файла; ValidationError для неверной записи."""
+        if not isinstance(record, dict):
+            raise ValidationError('Запись не является объектом.')
+        if record_type(record) != 'post':
+            raise ValidationError('Неизвестный тип записи.')
+        text = self.text_field.clean(record.get('text') or '', None)
+        if len(text) > self.text_field.max_length:
+            raise ValidationError(
+                'Текст длиннее {limit} символов.'.format(
+                    limit=self.text_field.max_length))
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            raise ValidationError('Автор не найден.')
+        group_id = None
+        if record.get('group'):
+            group_id = self.groups.get(record['group'])
+            if group_id is None:
+                raise ValidationError('Группа не найдена.')
+        pub_date = timezone.now()
+        if record.get('pub_date'):
+            pub_date = parse_record_date(
+                record['pub_date'], 'Некорректная дата публикации.')
+        return Post(
+            text=text,
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+            updated_at=pub_date,
+        )
+
+    def build_user(self, record):
+        """Пользователь без пароля из записи type user."""
+        user = User(
+            username=record.get('username'),
+            first_name=record.get('first_name') or '',
+            last_name=record.get('last_name') or '',
+            is_active=record.get('is_active', True) is not False,
+            password=make_password(None),
+        )
+        if record.get('date_joined'):
+            user.date_joined = parse_record_date(
+                record['date_joined'], 'Некорректная дата регистрации.')
+        user.clean_fields()
+        return user
+
+    def build_group(self, record):
+        """Группа из записи type group."""
+        group = Group(
+            slug=record.get('slug'),
+            title=record.get('title'),
+            description=record.get('description') or '',
+        )
+        if record.get('last_activity'):
+            group.last_activity = parse_record_date(
+                record['last_activity'], 'Некорректная дата активности.')
+        group.clean_fields(exclude=['description'])
+        return group
+
+    def build_records(self, batch, build):
+        """
+        Объекты из записей пачки, неверные записи пропускаются
+        с сообщением. Возвращает объекты и число пропущенных записей.
+        """
+        objects = []
+        for number, record in batch:
+            try:
+                objects.append(build(record))
+            except ValidationError as error:
+                self.stderr.write('Запись {number} пропущена: {error}'.format(
+                    number=number, error='; '.join(error.messages)))
+        return objects, len(batch) - len(objects)
+
+    def restore(self, model, relations, field, objects):
+        """
+        Создает объекты, ключа field которых еще нет в базе,
+        и возвращает их количество.
+        """
+        objects = {getattr(obj, field): obj for obj in objects}
+        existing = set(model.objects.filter(**{
+            field + '__in': objects,
+        }).values_list(field, flat=True))
+        created = [
+            obj for key, obj in objects.items() if key not in existing]
+        model.objects.bulk_create(created)
+        relations.forget(objects)
+        return len(created)
+
+    def import_relations(self, batch):
+        """
+        Создает пользователей и группы из записей type user и group
+        раньше постов пачки, которые на них ссылаются. Возвращает
+        число пропущенных записей.
+        """
+        users, skipped_users = self.build_records(
+            [item for item in batch if record_type(item[1]) == 'user'],
+            self.build_user)
+        groups, skipped_groups = self.build_records(
+            [item for item in batch if record_type(item[1]) == 'group'],
+            self.build_group)
+        with transaction.atomic():
+            self.created['users'] += self.restore(
+                User, self.authors, 'username', users)
+            self.created['groups'] += self.restore(
+                Group, self.groups, 'slug', groups)
+        if groups:
+            bump_generation(feed_scope('groups'))
+        return skipped_users + skipped_groups
+
+    def import_batch(self, batch):
+        """
+        Сохраняет пачку записей одной транзакцией. Вставка
+        не отправляет сигналы, поэтому счетчики, ленты подписчиков
+        и кеш лент обновляются здесь; индекс поиска обновляют триггеры
+        базы. Возвращает число
+        сохраненных постов и пропущенных записей.
+        """
+        skipped = self.import_relations(batch)
+        batch = [
+            item for item in batch
+            if record_type(item[1]) not in ('user', 'group')
+        ]
+        records = [record for _, record in batch]
+        dicts = [record for record in records if isinstance(record, dict)]
+        self.authors.load(record.get('author') for record in dicts)
+        self.groups.load(record.get('group') for record in dicts)
+        posts, failed = self.build_records(batch, self.build_post)
+        skipped += failed
+        if not posts:
+            return 0, skipped
+        authors = Counter(post.author_id for post in posts)
+        groups = Counter(post.group_id for post in posts)
+        latest = {}
+        for post in posts:
+            latest[post.group_id] = max(
+                latest.get(post.group_id, post.pub_date), post.pub_date)
+        with transaction.atomic():
+            last_pk = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+            insert_posts(posts)
+            # Посты тех же авторов, созданные в это время другими
+            # процессами, уже в лентах: повтор записи ленты пропускается.
+            fan_out_posts(Post.objects.filter(
+                pk__gt=last_pk, author_id__in=authors))
+            for author_id, count in authors.items():
+                change_author_count(author_id, count)
+            for group_id, count in groups.items():
+                change_group_count(group_id, count)
+                touch_group(group_id, latest[group_id])
+        invalidate_posts_cache(*{
+            (post.author_id, post.group_id) for post in posts
+        })
+        return len(posts), skipped
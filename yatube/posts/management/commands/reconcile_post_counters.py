@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+
+from posts.models import AuthorStats, Follow, Group, Post
+
+
+class Command(BaseCommand):
+    """
+    Сверяет счетчики постов авторов и групп и счетчики подписчиков
+    авторов с фактическими данными и исправляет расхождения.
+    """
+    help = 'Сверяет и исправляет счетчики постов авторов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        with transaction.atomic():
+            authors = self.reconcile_authors(dry_run)
+            groups = self.reconcile_groups(dry_run)
+        self.stdout.write(self.style.SUCCESS(
+            'Исправлено счетчиков: авторов - {authors}, групп - {groups}.'
+            .format(authors=authors, groups=groups)))
+
+    def reconcile_authors(self, dry_run):
+        """
+        Приводит счетчики постов и подписчиков AuthorStats
+        в соответствие с постами и подписками авторов.
+        """
+        posts = dict(
+            Post.objects.order_by().values_list('author').annotate(
+                Count('pk')).iterator())
+        followers = dict(
+            Follow.objects.order_by().values_list('author').annotate(
+                Count('pk')).iterator())
+        stored = {
+            user_id: counts for user_id, *counts in
+            AuthorStats.objects.values_list(
+                'user_id', 'posts_count', 'followers_count').iterator()
+        }
+        fixed = 0
+        for user_id in posts.keys() | followers.keys() | stored.keys():
+            counts = [posts.get(user_id, 0), followers.get(user_id, 0)]
+            if stored.get(user_id) == counts:
+                continue
+            fixed += 1
+            self.stdout.write('Автор {user_id}: {old} -> {new}'.format(
+                user_id=user_id, old=stored.get(user_id), new=counts))
+            if not dry_run:
+                AuthorStats.objects.update_or_create(
+                    user_id=user_id, defaults={
+                        'posts_count': counts[0],
+                        'followers_count': counts[1],
+                    })
+        return fixed
+
+    def reconcile_groups(self, dry_run):
+        """
+        Приводит Group.posts_count в соответствие с постами групп
+        и сдвигает последнюю активность группы до даты ее последнего
+        поста.
+        """
+        actual = {
+            group_id: (count, latest) for group_id, count, latest in
+            Post.objects.order_by().filter(group__isnull=False)
+            .values_list('group').annotate(Count('pk'), Max('pub_date'))
+            .iterator()
+        }
+        fixed = 0
+        groups = list(Group.objects.values_list(
+            'pk', 'posts_count', 'last_activity'))
+        for group_id, stored, last_activity in groups:
+            count, latest = actual.get(group_id, (0, None))
+            if latest is None or latest < last_activity:
+                latest = last_activity
+            if stored == count and latest == last_activity:
+                continue
+            fixed += 1
+            self.stdout.write('Группа {group_id}: {old} -> {new}'.format(
+                group_id=group_id, old=stored, new=count))
+            if not dry_run:
+                Group.objects.filter(pk=group_id).update(
+                    posts_count=count, last_activity=latest)
+        return fixed
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import posts.validators
+
+
+class Migration(migrations.Migration):
+    """
+    Индексы под запросы лент постов.
+
+    Изменения полей Post из моделей не затрагивают схему БД
+    (verbose_name, help_text, related_name, валидаторы), поэтому
+    применяются только к состоянию миграций: AlterField на SQLite
+    пересоздает и копирует всю таблицу. Индексы создаются обычным
+    CREATE INDEX без перестройки таблицы, каждый в своей транзакции.
+    """
+    atomic = False
+
+    dependencies = [
+        ('posts', '0003_auto_20211210_1637'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterModelOptions(
+                    name='post',
+                    options={'ordering': ['-pub_date', '-pk']},
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='author',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='group',
+                    field=models.ForeignKey(blank=True, help_text='Выберите группу', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postsin', to='posts.Group', verbose_name='Группа'),
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='pub_date',
+                    field=models.DateTimeField(auto_now_add=True, verbose_name='Дата публикации'),
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='text',
+                    field=models.TextField(help_text='Введите текст поста', max_length=10000, validators=[posts.validators.validate_not_empty], verbose_name='Текст поста'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='posts_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', 'pub_date', 'id'], name='posts_group_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['pub_date', 'id'], name='posts_pub_date_idx'),
+        ),
+    ]
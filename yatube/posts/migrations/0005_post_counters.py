@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    """Заполняет счетчики постов авторов и групп по текущим данным."""
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    # Запросы идут в мигрируемую базу: маршрутизатор отправил бы запись
+    # в основную, в том числе при migrate --database replica.
+    db_alias = schema_editor.connection.alias
+    posts = Post.objects.using(db_alias).order_by()
+    counts = posts.values('author').annotate(count=models.Count('pk'))
+    AuthorStats.objects.using(db_alias).bulk_create(
+        [AuthorStats(user_id=row['author'], posts_count=row['count'])
+         for row in counts.iterator()],
+        batch_size=500,
+    )
+    counts = posts.filter(group__isnull=False).values('group').annotate(
+        count=models.Count('pk'))
+    for row in counts.iterator():
+        Group.objects.using(db_alias).filter(pk=row['group']).update(
+            posts_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0004_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество постов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
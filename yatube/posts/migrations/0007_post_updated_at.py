@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Поле updated_at для валидаторов условных GET-запросов.
+
+    Колонка добавляется через ALTER TABLE ADD COLUMN: AddField на SQLite
+    пересоздает и копирует всю таблицу постов. Существующим постам
+    дата изменения заполняется датой публикации.
+    """
+
+    dependencies = [
+        ('posts', '0006_post_search_index'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    "ALTER TABLE posts_post ADD COLUMN updated_at datetime "
+                    "NOT NULL DEFAULT '1970-01-01 00:00:00'",
+                    'ALTER TABLE posts_post DROP COLUMN updated_at',
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='post',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            'UPDATE posts_post SET updated_at = pub_date',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated_at'], name='posts_updated_at_idx'),
+        ),
+    ]
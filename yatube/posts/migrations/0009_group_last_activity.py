@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:21
+
+import datetime
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+# Активность групп без постов: они уходят в конец каталога, а не
+# получают время миграции и не поднимаются в его начало.
+NO_ACTIVITY = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def fill_last_activity(apps, schema_editor):
+    """
+    Последняя активность группы - дата ее последнего поста,
+    у групп без постов - NO_ACTIVITY.
+    """
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    db_alias = schema_editor.connection.alias
+    groups = Group.objects.using(db_alias)
+    groups.update(last_activity=NO_ACTIVITY)
+    latest = Post.objects.using(db_alias).order_by().filter(
+        group__isnull=False).values('group').annotate(
+        latest=models.Max('pub_date'))
+    for row in latest.iterator():
+        groups.filter(pk=row['group']).update(last_activity=row['latest'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_activity',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Последняя активность'),
+        ),
+        migrations.RunPython(fill_last_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['last_activity', 'id'], name='posts_group_activity_idx'),
+        ),
+    ]
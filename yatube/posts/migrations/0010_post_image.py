@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Необязательное изображение поста.
+
+    Колонка добавляется через ALTER TABLE ADD COLUMN, как в 0007:
+    AddField на SQLite пересоздает таблицу постов и теряет триггеры
+    полнотекстового индекса.
+    """
+
+    dependencies = [
+        ('posts', '0009_group_last_activity'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    "ALTER TABLE posts_post ADD COLUMN image varchar(100) "
+                    "NOT NULL DEFAULT ''",
+                    'ALTER TABLE posts_post DROP COLUMN image',
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='post',
+                    name='image',
+                    field=models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка'),
+                ),
+            ],
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 from .validators import validate_not_empty
 from django.conf import settings
 
@@ -7,6 +8,16 @@ User = get_user_model()
 SYMBOLS = settings.SYMBOLS_FOR_TEXT_POST_STR
 
 
+class PostQuerySet(models.QuerySet):
+    """Набор запросов к постам."""
+    def feed(self):
+        """
+        Посты для лент: автор и группа загружаются одним JOIN,
+        чтобы шаблоны не выполняли запрос на каждый пост.
+        """
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     """
     Класс Post используется для создания моделей Post
@@ -23,6 +34,10 @@ class Post(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,6 +53,13 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Выберите группу'
     )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         """
@@ -45,10 +67,39 @@ class Post(models.Model):
         класса Post.
         """
         ordering = ['-pub_date', '-pk']
+        indexes = [
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='posts_author_pub_date_idx'),
+            models.Index(
+                fields=['group', 'pub_date', 'id'],
+                name='posts_group_pub_date_idx'),
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='posts_pub_date_idx'),
+            models.Index(
+                fields=['updated_at'],
+                name='posts_updated_at_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.text[:SYMBOLS]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает загруженные из БД автора и группу, чтобы при
+        сохранении поправить счетчики постов без лишнего запроса,
+        и изображение, чтобы создавать миниатюры только для нового.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_relations = (
+            instance.__dict__.get('author_id'),
+            instance.__dict__.get('group_id'),
+        )
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
 
 class Group(models.Model):
     """
@@ -59,6 +110,162 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество постов',
+        default=0,
+        editable=False
+    )
+    last_activity = models.DateTimeField(
+        verbose_name='Последняя активность',
+        default=timezone.now,
+        editable=False
+    )
+
+    class Meta:
+        """
+        Внутренний класс Meta для хранения метаданных
+        класса Group.
+        """
+        indexes = [
+            models.Index(
+                fields=['last_activity', 'id'],
+                name='posts_group_activity_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.title
+
+
+class AuthorStats(models.Model):
+    """
+    Класс AuthorStats хранит поддерживаемые сигналами счетчики
+    автора, чтобы страницы не считали его посты при каждом запросе.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество постов',
+        default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков',
+        default=0
+    )
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+
+class Follow(models.Model):
+    """
+    Класс Follow используется для создания моделей Follow
+    (подписка пользователя на автора).
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+    synced_at = models.DateTimeField(
+        verbose_name='Посты автора перенесены в ленту до',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        """
+        Внутренний класс Meta для хранения метаданных
+        класса Follow.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='posts_follow_unique'),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='posts_follow_not_self'),
+        ]
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+
+    def __str__(self) -> str:
+        return '{user} -> {author}'.format(user=self.user, author=self.author)
+
+
+class TimelineEntry(models.Model):
+    """
+    Класс TimelineEntry хранит ленту подписок пользователя: пост
+    автора, на которого он подписан. Дата публикации поста повторяется
+    здесь, чтобы страница ленты выбиралась по индексу без JOIN.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    class Meta:
+        """
+        Внутренний класс Meta для хранения метаданных
+        класса TimelineEntry.
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='posts_timeline_unique'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='posts_timeline_user_idx'),
+            models.Index(
+                fields=['user', 'author'],
+                name='posts_timeline_author_idx'),
+        ]
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Лента подписок'
+
+    def __str__(self) -> str:
+        return '{user}: {post}'.format(user=self.user_id, post=self.post_id)
+
+
+def author_posts_count(author) -> int:
+    """Количество постов автора по счетчику AuthorStats."""
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def author_followers_count(author_id) -> int:
+    """Количество подписчиков автора по счетчику AuthorStats."""
+    return AuthorStats.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True).first() or 0
@@ -0,0 +1,268 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import (EmptyPage, InvalidPage, Page,
+                                   PageNotAnInteger, Paginator)
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+from core.cache import get_or_compute
+
+from .cache import POSTS_SCOPE, feed_scope, get_generation
+
+COUNT_KEY = 'posts:count:{scope}:{generation}:{digest}'
+# Области кеша, поколение которых меняется при создании, изменении
+# и удалении объектов модели.
+COUNT_SCOPES = {
+    'posts.post': POSTS_SCOPE,
+    'posts.group': feed_scope('groups'),
+}
+
+
+class InvalidCursor(InvalidPage):
+    """Курсор страницы не удалось разобрать."""
+    pass
+
+
+def reverse_ordering(ordering):
+    """Возвращает порядок сортировки, обратный переданному."""
+    return tuple(
+        name[1:] if name.startswith('-') else '-' + name
+        for name in ordering
+    )
+
+
+def keyset_filter(ordering, values):
+    """
+    Возвращает условие Q, отбирающее записи, которые при сортировке
+    ordering идут строго после записи со значениями ключа values.
+    Для ('-pub_date', '-pk') это
+    pub_date <= v1 AND (pub_date < v1 OR (pub_date = v1 AND pk < v2)).
+    """
+    condition = Q()
+    equal = Q()
+    for name, value in zip(ordering, values):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{field}__{lookup}': value})
+        equal &= Q(**{field: value})
+    first = ordering[0]
+    bound = 'lte' if first.startswith('-') else 'gte'
+    return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition
+
+
+def encode_cursor(values):
+    """Возвращает непрозрачный курсор для значений ключа сортировки."""
+    values = [
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in values
+    ]
+    data = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    """
+    Возвращает значения ключа сортировки из курсора. Курсор должен
+    содержать ровно length значений.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (TypeError, ValueError, binascii.Error):
+        raise InvalidCursor('Некорректный курсор страницы')
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor('Некорректный курсор страницы')
+    return values
+
+
+def cursor_queryset(queryset, ordering, after=None, before=None):
+    """
+    Возвращает queryset, отсортированный для выборки страницы после
+    курсора after или перед курсором before. Для before порядок
+    обратный: строки идут от курсора к началу ленты.
+    """
+    if before:
+        ordering = reverse_ordering(ordering)
+    queryset = queryset.order_by(*ordering)
+    cursor = before or after
+    if cursor:
+        values = decode_cursor(cursor, len(ordering))
+        try:
+            queryset = queryset.filter(keyset_filter(ordering, values))
+        except (TypeError, ValueError, ValidationError):
+            raise InvalidCursor('Некорректный курсор страницы')
+    return queryset
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Паджинатор, который хранит количество объектов в кеше Django
+    вместо SELECT COUNT(*) на каждой странице. Кешируется количество
+    queryset или объекта с атрибутом model и методами count()
+    и count_key(), как у PostSearchResults. Ключ кеша включает
+    поколение области scope, по умолчанию - области модели из
+    COUNT_SCOPES, поэтому создание или удаление объекта сбрасывает
+    посчитанные значения.
+    """
+    def __init__(self, object_list, per_page, timeout=None, scope=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.timeout = (
+            settings.PAGINATOR_COUNT_CACHE_TIMEOUT
+            if timeout is None else timeout)
+        self.scope = scope
+
+    def count_scope(self):
+        """Область кеша, изменение которой сбрасывает количество."""
+        if self.scope is not None:
+            return self.scope
+        label = self.object_list.model._meta.label_lower
+        try:
+            return COUNT_SCOPES[label]
+        except KeyError:
+            raise ValueError(
+                'Для {0} нужно передать scope кеша количества'.format(label))
+
+    def count_cache_key(self):
+        """
+        Ключ кеша количества объектов: по SQL-запросу queryset
+        или по count_key() другого списка объектов.
+        """
+        if isinstance(self.object_list, QuerySet):
+            sql, params = self.object_list.query.sql_with_params()
+            source = sql + repr(params)
+        else:
+            source = self.object_list.count_key()
+        scope = self.count_scope()
+        digest = hashlib.md5(source.encode()).hexdigest()
+        return COUNT_KEY.format(
+            scope=scope, generation=get_generation(scope), digest=digest)
+
+    @cached_property
+    def count(self):
+        if not (isinstance(self.object_list, QuerySet)
+                or hasattr(self.object_list, 'count_key')):
+            return super().count
+        return get_or_compute(
+            self.count_cache_key(), self.object_list.count, self.timeout)
+
+
+class CursorPage(Page):
+    """
+    Страница курсорной паджинации. Вместо номера страницы хранит
+    признаки наличия соседних страниц и отдает курсоры для ссылок
+    ?after= и ?before=.
+    """
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<CursorPage of %s objects>' % len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class CursorPaginator(Paginator):
+    """
+    Паджинатор по ключу сортировки (keyset) вместо LIMIT/OFFSET.
+    Ключом служит сортировка queryset, по умолчанию Meta.ordering
+    модели. Стоимость выборки страницы не зависит от ее глубины.
+    Номера страниц (?page=N) поддерживаются для старых ссылок только
+    до max_page: OFFSET читает все строки перед страницей, поэтому
+    глубокие номера отклоняются, а количество строк не считается.
+    """
+    def __init__(self, object_list, per_page, ordering=None, max_page=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.ordering = tuple(
+            ordering
+            or object_list.query.order_by
+            or object_list.model._meta.ordering
+        )
+        self.max_page = (
+            settings.PAGINATOR_MAX_PAGE if max_page is None else max_page)
+
+    def validate_number(self, number):
+        """
+        Проверяет номер страницы без подсчета строк: номер больше
+        max_page - EmptyPage.
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не целое число')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        if number > self.max_page:
+            raise EmptyPage('Номер страницы больше {0}'.format(
+                self.max_page))
+        return number
+
+    def encode_cursor(self, obj):
+        """Возвращает непрозрачный курсор для объекта obj."""
+        return encode_cursor([
+            getattr(obj, name.lstrip('-')) for name in self.ordering
+        ])
+
+    def cursor_page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед before."""
+        queryset = cursor_queryset(
+            self.object_list, self.ordering, after=after, before=before)
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if before:
+            object_list.reverse()
+            return CursorPage(object_list, self, True, has_more)
+        return CursorPage(object_list, self, has_more, bool(after))
+
+    def number_page(self, number):
+        """Возвращает страницу по номеру через OFFSET, без COUNT."""
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1])
+        return CursorPage(
+            object_list[:self.per_page], self,
+            len(object_list) > self.per_page, number > 1)
+
+    def get_page(self, number=None, after=None, before=None):
+        """
+        Возвращает страницу по курсору, а при его отсутствии - по номеру.
+        Некорректный курсор или номер приводит к первой странице,
+        номер больше max_page - к EmptyPage.
+        """
+        if after or before:
+            try:
+                return self.cursor_page(after=after, before=before)
+            except InvalidCursor:
+                return self.cursor_page()
+        if number is None:
+            return self.cursor_page()
+        try:
+            number = self.validate_number(number)
+        except PageNotAnInteger:
+            return self.cursor_page()
+        return self.number_page(number)
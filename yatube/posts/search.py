@@ -0,0 +1,188 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+# Маркеры начала и конца совпадения в сниппете. Заменяются на <mark>
+# после экранирования текста поста.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+SNIPPET_TOKENS = 24
+
+CREATE_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+FTS_TRIGGERS = (
+    'posts_post_fts_ai',
+    'posts_post_fts_ad',
+    'posts_post_fts_au',
+)
+# Триггеры синхронизируют индекс при любых изменениях таблицы постов,
+# в том числе при bulk_create и прямых SQL-запросах.
+CREATE_FTS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai "
+    "AFTER INSERT ON posts_post BEGIN "
+    "INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad "
+    "AFTER DELETE ON posts_post BEGIN "
+    "INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_au "
+    "AFTER UPDATE OF text ON posts_post BEGIN "
+    "INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); "
+    "END",
+)
+DROP_FTS = (
+    'DROP TRIGGER IF EXISTS posts_post_fts_ai',
+    'DROP TRIGGER IF EXISTS posts_post_fts_ad',
+    'DROP TRIGGER IF EXISTS posts_post_fts_au',
+    'DROP TABLE IF EXISTS posts_post_fts',
+)
+REBUILD_FTS = "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')"
+SEARCH_SQL = (
+    'SELECT rowid, snippet(posts_post_fts, 0, %s, %s, %s, %s) '
+    'FROM posts_post_fts WHERE posts_post_fts MATCH %s '
+    'ORDER BY rank LIMIT %s OFFSET %s'
+)
+COUNT_SQL = (
+    'SELECT COUNT(*) FROM posts_post_fts WHERE posts_post_fts MATCH %s'
+)
+MATCH_IDS_SQL = (
+    'SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH %s'
+)
+
+
+def fts_available(using=connection):
+    """Полнотекстовый индекс FTS5 доступен только на SQLite."""
+    return using.vendor == 'sqlite'
+
+
+def ensure_search_index(using=connection):
+    """
+    Создает таблицу FTS5 и триггеры синхронизации, если их нет.
+    Если триггеры пропали (SQLite пересоздает таблицу posts_post при
+    изменении ее схемы в миграциях), индекс перестраивается целиком.
+    """
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' "
+            "AND name IN (%s, %s, %s)", FTS_TRIGGERS)
+        triggers = cursor.fetchone()[0]
+        cursor.execute(CREATE_FTS_TABLE)
+        for sql in CREATE_FTS_TRIGGERS:
+            cursor.execute(sql)
+        if triggers < len(FTS_TRIGGERS):
+            cursor.execute(REBUILD_FTS)
+
+
+def drop_search_index(using=connection):
+    """Удаляет таблицу FTS5 и триггеры синхронизации."""
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        for sql in DROP_FTS:
+            cursor.execute(sql)
+
+
+def build_match_query(query):
+    """
+    Превращает пользовательский запрос в выражение MATCH для FTS5.
+    Каждое слово берется в кавычки как префикс, поэтому операторы
+    и спецсимволы FTS5 во вводе не вызывают синтаксических ошибок.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join('"{word}"*'.format(word=word) for word in words)
+
+
+def highlight(snippet):
+    """Экранирует сниппет и выделяет совпадения тегом <mark>."""
+    html = escape(snippet)
+    html = html.replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    return mark_safe(html)
+
+
+class PostSearchResults:
+    """
+    Результаты поиска постов, упорядоченные по релевантности (bm25).
+    Поддерживает count() и срезы, поэтому передается в Paginator:
+    запрос к индексу выполняется только для запрошенной страницы.
+    Посты в срезе получают атрибут snippet с выделенными совпадениями.
+    model и count_key() позволяют CachedCountPaginator кешировать
+    количество найденных постов.
+    """
+    model = Post
+
+    def __init__(self, query):
+        self.query = query
+        self.match = build_match_query(query)
+
+    def count_key(self):
+        """Ключ количества: запрос FTS5 или, без FTS5, текст поиска."""
+        if fts_available():
+            return 'match:' + self.match
+        return 'like:' + self.query
+
+    def count(self):
+        if not self.match:
+            return 0
+        if not fts_available():
+            return Post.objects.filter(text__icontains=self.query).count()
+        with connection.cursor() as cursor:
+            cursor.execute(COUNT_SQL, [self.match])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = index.stop - start
+        if not self.match or limit <= 0:
+            return []
+        if not fts_available():
+            posts = list(Post.objects.feed().filter(
+                text__icontains=self.query)[start:index.stop])
+            for post in posts:
+                post.snippet = post.text
+            return posts
+        with connection.cursor() as cursor:
+            cursor.execute(SEARCH_SQL, [
+                MATCH_START, MATCH_END, '…', SNIPPET_TOKENS,
+                self.match, limit, start,
+            ])
+            rows = cursor.fetchall()
+        posts = Post.objects.feed().in_bulk([row[0] for row in rows])
+        results = []
+        for post_id, snippet in rows:
+            if post_id in posts:
+                post = posts[post_id]
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
+
+
+def filter_by_search(queryset, query):
+    """
+    Оставляет в queryset постов только найденные полнотекстовым
+    индексом. Без FTS5 используется поиск LIKE.
+    """
+    match = build_match_query(query)
+    if not match:
+        return queryset
+    if not fts_available():
+        return queryset.filter(text__icontains=query)
+    return queryset.filter(pk__in=RawSQL(MATCH_IDS_SQL, [match]))
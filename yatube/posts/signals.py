@@ -0,0 +1,193 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import PAGES_SCOPE, POSTS_SCOPE, bump_generation, feed_scope
+from .models import AuthorStats, Follow, Group, Post
+from .thumbnails import generate_thumbnails
+from .timeline import fan_out_post, pull_posts, remove_author
+
+User = get_user_model()
+
+# Поля, из которых складывается показанное на страницах имя автора.
+NAME_FIELDS = {'first_name', 'last_name'}
+
+
+def change_author_stats(author_id, field, delta):
+    """Атомарно изменяет счетчик field в AuthorStats автора на delta."""
+    stats = AuthorStats.objects.filter(user_id=author_id)
+    if delta < 0:
+        stats = stats.filter(**{field + '__gte': -delta})
+    if stats.update(**{field: F(field) + delta}) or delta < 0:
+        return
+    if not AuthorStats.objects.filter(user_id=author_id).exists():
+        # Первое изменение после появления счетчиков: считаем с нуля.
+        AuthorStats.objects.get_or_create(
+            user_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id).count(),
+                'followers_count': Follow.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+
+
+def change_author_count(author_id, delta):
+    """Атомарно изменяет счетчик постов автора на delta."""
+    change_author_stats(author_id, 'posts_count', delta)
+
+
+def change_group_count(group_id, delta):
+    """Атомарно изменяет счетчик постов группы на delta."""
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(posts_count__gte=-delta)
+    groups.update(posts_count=F('posts_count') + delta)
+
+
+def touch_group(group_id, moment):
+    """Сдвигает последнюю активность группы вперед до moment."""
+    if group_id is None:
+        return
+    Group.objects.filter(pk=group_id, last_activity__lt=moment).update(
+        last_activity=moment)
+
+
+def update_counters(created, loaded, current):
+    """
+    Обновляет счетчики при создании поста и смене автора или группы.
+    loaded и current - пары (author_id, group_id) до и после сохранения.
+    """
+    if created:
+        change_author_count(current[0], 1)
+        change_group_count(current[1], 1)
+    elif loaded is not None and loaded != current:
+        old_author_id, old_group_id = loaded
+        if old_author_id is not None and old_author_id != current[0]:
+            change_author_count(old_author_id, -1)
+            change_author_count(current[0], 1)
+        if old_group_id != current[1]:
+            change_group_count(old_group_id, -1)
+            change_group_count(current[1], 1)
+
+
+def invalidate_posts_cache(*relations):
+    """
+    Сбрасывает кеш количеств и ленты, в которых показывался или будет
+    показан пост. relations - пары (author_id, group_id).
+    """
+    scopes = {POSTS_SCOPE, PAGES_SCOPE, feed_scope('index')}
+    for author_id, group_id in filter(None, relations):
+        if author_id is not None:
+            scopes.add(feed_scope('profile', author_id))
+        if group_id is not None:
+            scopes.add(feed_scope('group', group_id))
+            scopes.add(feed_scope('groups'))
+    for scope in scopes:
+        bump_generation(scope)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    """
+    Обновляет счетчики и сбрасывает кеш после сохранения поста,
+    ставит в очередь создание миниатюр нового изображения.
+    """
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_relations', None)
+    current = (instance.author_id, instance.group_id)
+    update_counters(created, loaded, current)
+    if created:
+        touch_group(instance.group_id, instance.pub_date)
+    elif loaded is not None and loaded[1] != instance.group_id:
+        touch_group(instance.group_id, timezone.now())
+    invalidate_posts_cache(loaded, current)
+    instance._loaded_relations = current
+    if created:
+        fan_out_post(instance)
+    image = instance.image.name
+    if image and image != getattr(instance, '_loaded_image', None):
+        generate_thumbnails.enqueue(instance.pk)
+    instance._loaded_image = image
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    """Уменьшает счетчики и сбрасывает кеш после удаления поста."""
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    invalidate_posts_cache((instance.author_id, instance.group_id))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw, **kwargs):
+    """
+    Сбрасывает кеш ленты группы, каталога групп, главной и страниц
+    для анонимных посетителей при изменении группы.
+    """
+    if raw:
+        return
+    bump_generation(feed_scope('group', instance.pk))
+    bump_generation(feed_scope('groups'))
+    bump_generation(feed_scope('index'))
+    bump_generation(PAGES_SCOPE)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw, **kwargs):
+    """Учитывает подписчика и переносит последние посты автора в ленту."""
+    if raw or not created:
+        return
+    change_author_stats(instance.author_id, 'followers_count', 1)
+    pull_posts(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """Уменьшает число подписчиков и убирает посты автора из ленты."""
+    change_author_stats(instance.author_id, 'followers_count', -1)
+    remove_author(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    """
+    Сбрасывает кеш каталога групп, главной и страниц для анонимных
+    посетителей после удаления группы.
+    """
+    bump_generation(feed_scope('groups'))
+    bump_generation(feed_scope('index'))
+    bump_generation(PAGES_SCOPE)
+
+
+@receiver(post_init, sender=User)
+def author_loaded(sender, instance, **kwargs):
+    """Запоминает имя автора, чтобы author_saved заметил его смену."""
+    if not NAME_FIELDS & instance.get_deferred_fields():
+        instance._loaded_full_name = instance.get_full_name()
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, raw, update_fields, **kwargs):
+    """
+    Сбрасывает кеш лент, количеств и страниц, где показаны посты
+    автора, когда меняется его имя. Регистрация, вход и смена пароля
+    имени не меняют и кеш не трогают.
+    """
+    if (raw or created or NAME_FIELDS & instance.get_deferred_fields()
+            or update_fields is not None
+            and not NAME_FIELDS & update_fields):
+        return
+    full_name = instance.get_full_name()
+    if full_name == getattr(instance, '_loaded_full_name', None):
+        return
+    instance._loaded_full_name = full_name
+    relations = Post.objects.filter(author=instance).values_list(
+        'author_id', 'group_id').distinct()
+    invalidate_posts_cache((instance.pk, None), *relations)
@@ -0,0 +1,15 @@
+from django import template
+
+from posts.thumbnails import post_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(image, size):
+    """
+    Адрес миниатюры изображения поста. Пока миниатюра не создана
+    обработчиком очереди, показывается оригинал.
+    """
+    thumbnail = post_thumbnail(image, size)
+    return thumbnail.url if thumbnail else image.url
@@ -0,0 +1,123 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostApiTests(TestCase):
+    """
+    Класс для создания тестов JSON API лент и постов приложения posts.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(
+                text='Тестовый пост {i}'.format(i=i),
+                author=cls.user,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(25)
+        ])
+        cls.post = Post.objects.get(text='Тестовый пост 0')
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_json(self, address, **params):
+        response = self.client.get(address, params)
+        content = b''.join(response.streaming_content)
+        return response, json.loads(content)
+
+    def test_feed_pages_follow_cursors(self):
+        """
+        Лента отдается страницами по курсорам next/previous в том же
+        порядке, что и HTML-лента.
+        """
+        address = reverse('posts:api_index')
+        response, data = self.get_json(address, limit=10)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(data['previous'], None)
+        texts = [post['text'] for post in data['results']]
+        while data['next']:
+            response, data = self.get_json(
+                address, limit=10, after=data['next'])
+            texts.extend(post['text'] for post in data['results'])
+        self.assertEqual(
+            texts,
+            ['Тестовый пост {i}'.format(i=i) for i in reversed(range(25))])
+        self.assertEqual(len(data['results']), 5)
+        response, data = self.get_json(
+            address, limit=10, before=data['previous'])
+        self.assertEqual(
+            [post['text'] for post in data['results']],
+            ['Тестовый пост {i}'.format(i=i) for i in range(14, 4, -1)])
+        self.assertIsNotNone(data['previous'])
+        self.assertIsNotNone(data['next'])
+
+    def test_feed_selects_requested_fields(self):
+        """Параметр fields= ограничивает поля постов в ответе."""
+        address = reverse('posts:api_group_list', kwargs={'slug': 'test-slug'})
+        response, data = self.get_json(address, fields='id,author,group')
+        self.assertEqual(len(data['results']), 10)
+        for post in data['results']:
+            self.assertEqual(set(post), {'id', 'author', 'group'})
+            self.assertEqual(post['author'], 'auth')
+            self.assertEqual(post['group'], 'test-slug')
+
+    def test_feed_is_streamed_with_one_query(self):
+        """Страница профиля автора выбирается одним запросом к постам."""
+        address = reverse('posts:api_profile', kwargs={'username': 'auth'})
+        with self.assertNumQueries(2):
+            response, data = self.get_json(address, limit=25)
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(data['results']), 25)
+        self.assertIsNone(data['next'])
+
+    def test_bad_parameters_return_json_errors(self):
+        """Неверные параметры и адреса дают ответы с ошибкой в JSON."""
+        addresses = {
+            reverse('posts:api_index') + '?fields=password': 400,
+            reverse('posts:api_index') + '?limit=0': 400,
+            reverse('posts:api_index') + '?limit=abc': 400,
+            reverse('posts:api_index') + '?after=broken': 400,
+            reverse('posts:api_group_list', kwargs={'slug': 'none'}): 404,
+            reverse('posts:api_post_detail', kwargs={'post_id': 0}): 404,
+        }
+        for address, status in addresses.items():
+            with self.subTest(address=address):
+                response = self.client.get(address)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_post_detail(self):
+        """Пост отдается в JSON с автором и группой."""
+        response = self.client.get(reverse(
+            'posts:api_post_detail', kwargs={'post_id': self.post.pk}))
+        data = response.json()
+        self.assertEqual(data['id'], self.post.pk)
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['author'], 'auth')
+        self.assertIsNone(data['group'])
+
+    def test_unchanged_feed_returns_not_modified(self):
+        """Повторный запрос ленты с совпадающим ETag получает 304."""
+        address = reverse('posts:api_index')
+        etag = self.client.get(address)['ETag']
+        response = self.client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,199 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cache import feed_scope, get_generation
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedFragmentCacheTests(TestCase):
+    """
+    Класс для создания тестов кеширования фрагментов лент постов
+    и их сброса при изменении постов.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group_second = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-second',
+            description='Тестовое описание 2',
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста для кеша.',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+        ]
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_repeat_feed_view_skips_feed_queries(self):
+        """
+        Повторный показ ленты не выполняет запросов к постам: остается
+        только поиск группы или автора.
+        """
+        expected_queries = dict(zip(self.feeds, (0, 1, 1)))
+        for address, queries in expected_queries.items():
+            with self.subTest(address=address):
+                first = self.client.get(address)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(address)
+                self.assertEqual(response.content, first.content)
+
+    def test_new_post_appears_in_cached_feeds(self):
+        """Новый пост сразу виден в закешированных лентах."""
+        for address in self.feeds:
+            self.client.get(address)
+        Post.objects.create(
+            text='Свежий пост после кеширования.',
+            author=self.user,
+            group=self.group,
+        )
+        for address in self.feeds:
+            with self.subTest(address=address):
+                response = self.client.get(address)
+                self.assertContains(response, 'Свежий пост после кеширования.')
+
+    def test_post_change_bumps_only_affected_feeds(self):
+        """
+        Перенос поста в другую группу сбрасывает кеш обеих групп,
+        но не затрагивает ленты, где пост не показывается.
+        """
+        other = User.objects.create_user(username='other')
+        scopes = [
+            feed_scope('group', self.group.pk),
+            feed_scope('group', self.group_second.pk),
+            feed_scope('profile', other.pk),
+        ]
+        before = [get_generation(scope) for scope in scopes]
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.group_second
+        post.save()
+        after = [get_generation(scope) for scope in scopes]
+        self.assertNotEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+        self.assertEqual(after[2], before[2])
+
+    def test_author_rename_refreshes_cached_feeds(self):
+        """
+        Новое имя автора сразу видно в закешированных лентах,
+        регистрация нового пользователя кеш лент не сбрасывает.
+        """
+        for address in self.feeds:
+            self.client.get(address)
+        generation = get_generation(feed_scope('index'))
+        User.objects.create_user(username='newcomer')
+        self.assertEqual(get_generation(feed_scope('index')), generation)
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Новое'
+        author.last_name = 'Имя'
+        author.save()
+        for address in self.feeds:
+            with self.subTest(address=address):
+                response = self.client.get(address)
+                self.assertContains(response, 'Новое Имя')
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Класс для создания тестов условных GET-запросов (ETag
+    и Last-Modified) к страницам приложения posts.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста для условного GET.',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.pages = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+            reverse('posts:search') + '?q=пост',
+        ]
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_unchanged_page_returns_not_modified(self):
+        """Повторный запрос с совпадающим ETag получает 304."""
+        for address in self.pages:
+            with self.subTest(address=address):
+                etag = self.client.get(address)['ETag']
+                response = self.client.get(
+                    address, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_changed_post_invalidates_etag(self):
+        """После изменения поста страницы отдаются заново."""
+        etags = {
+            address: self.client.get(address)['ETag']
+            for address in self.pages
+        }
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Измененный текст поста.'
+        post.save()
+        for address, etag in etags.items():
+            with self.subTest(address=address):
+                response = self.client.get(
+                    address, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        """Страницы гостя и авторизованного пользователя различаются."""
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        for address in self.pages:
+            with self.subTest(address=address):
+                self.assertNotEqual(
+                    self.client.get(address)['ETag'],
+                    authorized_client.get(address)['ETag'])
+
+    def test_post_detail_etag_follows_author_and_group(self):
+        """
+        Переименование автора или группы меняет ETag страницы поста.
+        Last-Modified страница не отдает: дата изменения поста
+        при этом не меняется.
+        """
+        address = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk})
+        changes = {
+            'group': (Group.objects.get(pk=self.group.pk),
+                      'title', 'Новое название группы'),
+            'author': (User.objects.get(pk=self.user.pk),
+                       'first_name', 'Имя'),
+        }
+        for name, (instance, field, value) in changes.items():
+            with self.subTest(changed=name):
+                response = self.client.get(address)
+                self.assertFalse(response.has_header('Last-Modified'))
+                setattr(instance, field, value)
+                instance.save()
+                response = self.client.get(
+                    address, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, value)
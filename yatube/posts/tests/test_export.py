@@ -0,0 +1,129 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsCommandTests(TestCase):
+    """
+    Класс для создания тестов команды потоковой выгрузки постов
+    export_posts.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.reader = User.objects.create_user(
+            username='reader', first_name='Читатель')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.empty_group = Group.objects.create(
+            title='Пустая группа',
+            slug='empty-slug',
+            description='Группа без постов',
+        )
+        Post.objects.bulk_create([
+            Post(
+                text='Пост «{i}», с запятой'.format(i=i),
+                author=cls.user if i % 2 else cls.other,
+                group=cls.group if i % 3 else None,
+            )
+            for i in range(7)
+        ])
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def export_posts(self, name, *args):
+        path = os.path.join(self.directory, name)
+        call_command('export_posts', path, *args, stderr=StringIO())
+        return path
+
+    def read_jsonl(self, path):
+        with open(path, encoding='utf-8') as export_file:
+            return [json.loads(line) for line in export_file]
+
+    def test_export_jsonl_in_batches(self):
+        """
+        Пользователи, группы и посты выгружаются отдельными видами
+        записей по порядку pk небольшими пачками.
+        """
+        path = self.export_posts('posts.jsonl', '--batch-size', '2')
+        records = self.read_jsonl(path)
+        self.assertEqual(
+            [record['type'] for record in records],
+            ['user'] * 3 + ['group'] * 2 + ['post'] * 7)
+        self.assertEqual(records[2]['username'], 'reader')
+        self.assertEqual(records[2]['first_name'], 'Читатель')
+        self.assertNotIn('password', records[2])
+        self.assertEqual(records[4]['slug'], 'empty-slug')
+        self.assertEqual(records[4]['description'], 'Группа без постов')
+        rows = records[5:]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            list(Post.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual(rows[1]['author'], 'auth')
+        self.assertEqual(rows[1]['group'], 'test-slug')
+        self.assertIsNone(rows[0]['group'])
+
+    def test_export_compressed_csv_with_filters(self):
+        """Фильтры по автору и группе, сжатие gzip по расширению."""
+        path = self.export_posts(
+            'posts.csv.gz', '--author', 'auth', '--group', 'test-slug')
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(len(rows), Post.objects.filter(
+            author=self.user, group=self.group).count())
+        for row in rows:
+            self.assertEqual(row['author'], 'auth')
+            self.assertIn(', с запятой', row['text'])
+
+    def test_export_date_range(self):
+        """Посты вне диапазона дат не выгружаются."""
+        path = self.export_posts(
+            'posts.jsonl', '--records', 'posts', '--until', '2000-01-01')
+        self.assertEqual(os.path.getsize(path), 0)
+
+    def test_export_to_command_stdout(self):
+        """Выгрузка на стандартный вывод пишется в stdout команды."""
+        stdout = StringIO()
+        call_command(
+            'export_posts', '--records', 'groups', '--format', 'csv',
+            stdout=stdout, stderr=StringIO())
+        rows = list(csv.DictReader(StringIO(stdout.getvalue())))
+        self.assertEqual(
+            [row['slug'] for row in rows], ['test-slug', 'empty-slug'])
+
+    def test_export_can_be_imported(self):
+        """
+        Выгрузка читается командой import_posts, которая восстанавливает
+        и пользователей и группы без постов.
+        """
+        path = self.export_posts('posts.jsonl')
+        Post.objects.all().delete()
+        self.reader.delete()
+        self.empty_group.delete()
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 7)
+        reader = User.objects.get(username='reader')
+        self.assertEqual(reader.first_name, 'Читатель')
+        self.assertFalse(reader.has_usable_password())
+        self.assertEqual(
+            Group.objects.get(slug='empty-slug').description,
+            'Группа без постов')
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class SyndicationFeedTests(TestCase):
+    """
+    Класс для создания тестов лент RSS и Atom: главной, группы
+    и автора.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Текст тестового поста для ленты.',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.feeds = {}
+        for kind, content_type in (
+            ('rss', 'application/rss+xml'),
+            ('atom', 'application/atom+xml'),
+        ):
+            cls.feeds.update({
+                reverse('posts:index_' + kind): content_type,
+                reverse('posts:group_list_' + kind,
+                        kwargs={'slug': cls.group.slug}): content_type,
+                reverse('posts:profile_' + kind,
+                        kwargs={'username': cls.user.username}): content_type,
+            })
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_feeds_list_posts(self):
+        """Ленты отдаются в своем формате и содержат посты."""
+        for address, content_type in self.feeds.items():
+            with self.subTest(address=address):
+                response = self.client.get(address)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type))
+                self.assertContains(response, self.post.text)
+                self.assertContains(response, reverse(
+                    'posts:post_detail', kwargs={'post_id': self.post.pk}))
+
+    def test_unknown_group_and_author_return_404(self):
+        """Ленты несуществующих группы и автора отдают 404."""
+        addresses = [
+            reverse('posts:group_list_rss', kwargs={'slug': 'none'}),
+            reverse('posts:profile_atom', kwargs={'username': 'none'}),
+        ]
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertEqual(self.client.get(address).status_code, 404)
+
+    def test_repeat_poll_is_cached(self):
+        """
+        Повторный опрос ленты не выбирает посты, а с совпадающим
+        ETag получает 304.
+        """
+        expected_queries = (0, 1, 1) * 2
+        for (address, _), queries in zip(
+                self.feeds.items(), expected_queries):
+            with self.subTest(address=address):
+                first = self.client.get(address)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(address)
+                self.assertEqual(response.content, first.content)
+                response = self.client.get(
+                    address, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_new_post_changes_feeds(self):
+        """Новый пост сразу попадает в ленты и меняет их ETag."""
+        etags = {
+            address: self.client.get(address)['ETag']
+            for address in self.feeds
+        }
+        Post.objects.create(
+            text='Свежий пост для ленты.',
+            author=self.user,
+            group=self.group,
+        )
+        for address, etag in etags.items():
+            with self.subTest(address=address):
+                response = self.client.get(
+                    address, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Свежий пост для ленты.')
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import query_budget
+from posts.models import AuthorStats, Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class FollowTimelineTests(TestCase):
+    """
+    Класс для создания тестов подписок и ленты избранных авторов
+    с раскладкой постов при публикации и при чтении.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки', author=cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.stranger_client = Client()
+        self.stranger_client.force_login(self.stranger)
+
+    def follow(self, client=None, author=None):
+        return (client or self.reader_client).get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': (author or self.author).username}))
+
+    def timeline(self, client=None, **params):
+        response = (client or self.reader_client).get(
+            reverse('posts:follow_index'), params)
+        return [entry.post for entry in response.context['page_obj']]
+
+    def test_follow_and_unfollow(self):
+        """
+        Подписка добавляет посты автора в ленту и учитывает подписчика,
+        отписка убирает их. На себя подписаться нельзя.
+        """
+        response = self.follow()
+        self.assertRedirects(response, reverse(
+            'posts:profile', kwargs={'username': self.author.username}))
+        self.assertEqual(self.timeline(), [self.old_post])
+        self.assertEqual(AuthorStats.objects.get(
+            user=self.author).followers_count, 1)
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.author.username}))
+        self.assertEqual(self.timeline(), [])
+        self.assertEqual(AuthorStats.objects.get(
+            user=self.author).followers_count, 0)
+        self.follow(author=self.reader)
+        self.assertFalse(Follow.objects.filter(author=self.reader).exists())
+
+    def test_guest_cannot_follow(self):
+        """Гость перенаправляется на страницу входа."""
+        response = self.client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост появляется только в лентах подписчиков."""
+        self.follow()
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertEqual(self.timeline()[0], post)
+        self.assertEqual(self.timeline(self.stranger_client), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_popular_author_posts_are_pulled_on_read(self):
+        """
+        Посты автора с подписчиками сверх лимита не раскладываются
+        при публикации, а попадают в ленту при ее чтении.
+        """
+        self.follow()
+        self.follow(self.stranger_client)
+        post = Post.objects.create(text='Пост популярного автора',
+                                   author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.timeline(), [post, self.old_post])
+        self.assertEqual(
+            self.timeline(self.stranger_client), [post, self.old_post])
+
+    def test_timeline_pages_follow_cursors(self):
+        """Лента подписок листается курсорами в порядке публикации."""
+        self.follow()
+        Post.objects.bulk_create([
+            Post(text='Пост {i}'.format(i=i), author=self.author)
+            for i in range(12)
+        ])
+        Follow.objects.get(user=self.reader).delete()
+        self.follow()
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        first_page = [entry.post for entry in response.context['page_obj']]
+        self.assertEqual(len(first_page), 10)
+        second_page = self.timeline(
+            after=response.context['page_obj'].next_cursor)
+        self.assertEqual(len(second_page), 3)
+        expected = list(Post.objects.filter(author=self.author))
+        self.assertEqual(first_page + second_page, expected)
+
+    def test_timeline_query_budget(self):
+        """Страница ленты подписок выбирается с постами одним запросом."""
+        self.follow()
+        with query_budget(4):
+            self.timeline()
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import query_budget
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class GroupsDirectoryTests(TestCase):
+    """
+    Класс для создания тестов каталога сообществ posts:groups.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        now = timezone.now()
+        Group.objects.bulk_create([
+            Group(
+                title='Группа {i}'.format(i=i),
+                slug='group-{i}'.format(i=i),
+                description='Описание {i}'.format(i=i),
+                last_activity=now - timedelta(days=i),
+            )
+            for i in range(15)
+        ])
+        cls.quiet_group = Group.objects.get(slug='group-14')
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_groups(self, **params):
+        response = self.client.get(reverse('posts:groups'), params)
+        return response, list(response.context['page_obj'])
+
+    def test_groups_sorted_by_activity(self):
+        """Сообщества идут от недавно активных, страницы по курсору."""
+        response, first_page = self.get_groups()
+        self.assertEqual(
+            [group.slug for group in first_page],
+            ['group-{i}'.format(i=i) for i in range(10)])
+        response, second_page = self.get_groups(
+            after=response.context['page_obj'].next_cursor)
+        self.assertEqual(len(second_page), 5)
+
+    def test_new_post_moves_group_up(self):
+        """Новый пост поднимает сообщество и увеличивает его счетчик."""
+        self.get_groups()
+        Post.objects.create(
+            text='Пост тихого сообщества',
+            author=self.user,
+            group=self.quiet_group,
+        )
+        response, groups = self.get_groups()
+        self.assertEqual(groups[0], self.quiet_group)
+        self.assertEqual(groups[0].posts_count, 1)
+        self.assertContains(response, 'Записей: 1')
+
+    def test_groups_page_query_budget(self):
+        """
+        Страница каталога выбирается одним запросом без агрегации,
+        повторный показ берется из кеша.
+        """
+        with query_budget(1):
+            first = self.client.get(reverse('posts:groups'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('posts:groups'))
+        self.assertEqual(response.content, first.content)
+
+    def test_groups_query_uses_index(self):
+        """Запрос страницы каталога обслуживается индексом активности."""
+        response, _ = self.get_groups()
+        address = reverse('posts:groups') + '?after=' + (
+            response.context['page_obj'].next_cursor)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(address)
+        for query in queries:
+            with self.subTest(sql=query['sql']):
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                    plan = '\n'.join(row[-1] for row in cursor)
+                self.assertIn('posts_group_activity_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_migration_sends_groups_without_posts_down(self):
+        """
+        Заполнение last_activity в миграции ставит группам без постов
+        NO_ACTIVITY, а группам с постами - дату последнего поста.
+        """
+        migration = import_module(
+            'posts.migrations.0009_group_last_activity')
+        post = Post.objects.create(
+            text='Пост тихого сообщества',
+            author=self.user,
+            group=self.quiet_group,
+        )
+        migration.fill_last_activity(
+            apps, SimpleNamespace(connection=connection))
+        self.quiet_group.refresh_from_db()
+        self.assertEqual(self.quiet_group.last_activity, post.pub_date)
+        self.assertEqual(
+            set(Group.objects.exclude(pk=self.quiet_group.pk).values_list(
+                'last_activity', flat=True)),
+            {migration.NO_ACTIVITY})
+
+    def test_migration_fills_migrated_database(self):
+        """
+        Заполнение last_activity при миграции реплики меняет группы
+        реплики, а не основной базы.
+        """
+        migration = import_module(
+            'posts.migrations.0009_group_last_activity')
+        group = Group.objects.using('replica').create(
+            title='Группа реплики', slug='replica-slug')
+        migration.fill_last_activity(
+            apps, SimpleNamespace(connection=connections['replica']))
+        self.assertEqual(
+            Group.objects.using('replica').get(pk=group.pk).last_activity,
+            migration.NO_ACTIVITY)
+        self.assertNotIn(
+            migration.NO_ACTIVITY,
+            Group.objects.using('default').values_list(
+                'last_activity', flat=True))
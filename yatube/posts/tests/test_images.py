@@ -0,0 +1,106 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+from tasks.models import Task
+from tasks.queue import run_pending
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='image.png', size=(1200, 800)):
+    """Загружаемый файл с PNG-изображением размера size."""
+    content = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(content, 'PNG')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    """
+    Класс для создания тестов изображений постов: загрузки с
+    ограничениями и миниатюр, создаваемых обработчиком очереди.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create_post(self, image):
+        return self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': image},
+        )
+
+    def test_thumbnails_are_generated_by_queue(self):
+        """
+        Лента до обработки очереди показывает оригинал, не уменьшая
+        его при отрисовке, после обработки - готовую миниатюру.
+        """
+        self.create_post(make_image())
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.startswith('posts/'))
+        self.assertEqual(Task.objects.count(), 1)
+
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, post.image.url)
+
+        self.assertEqual(run_pending(), 1)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, post.image.url)
+        self.assertContains(response, '/media/cache/')
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertNotContains(response, post.image.url)
+        self.assertContains(response, '/media/cache/')
+
+    def test_edit_without_new_image_keeps_thumbnails(self):
+        """Правка текста не ставит миниатюры в очередь повторно."""
+        self.create_post(make_image())
+        run_pending()
+        post = Post.objects.get()
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Новый текст'},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Новый текст')
+        self.assertTrue(post.image)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(UPLOAD_MAX_SIZE=1024)
+    def test_large_file_is_rejected(self):
+        """Файл больше UPLOAD_MAX_SIZE отклоняется формой."""
+        response = self.create_post(make_image())
+        self.assertFormError(
+            response, 'form', 'image', 'Файл больше 1,0\xa0КБ.')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_DIMENSION=1000)
+    def test_large_image_is_rejected(self):
+        """Изображение больше POST_IMAGE_MAX_DIMENSION отклоняется."""
+        response = self.create_post(make_image())
+        self.assertFormError(
+            response, 'form', 'image',
+            'Изображение больше 1000 пикселей по одной из сторон.')
+        self.assertFalse(Post.objects.exists())
@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts.cache import feed_scope, get_generation
+from posts.models import (Follow, Group, Post, TimelineEntry,
+                          author_posts_count)
+from posts.search import PostSearchResults
+
+User = get_user_model()
+
+
+class ImportPostsCommandTests(TestCase):
+    """
+    Класс для создания тестов команды пакетного импорта постов
+    import_posts.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as import_file:
+            import_file.write(content)
+        return path
+
+    def import_posts(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_posts', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_jsonl_in_batches(self):
+        """
+        Посты импортируются пачками с датами из файла, неверные записи
+        пропускаются, счетчики, кеш и индекс поиска обновляются.
+        """
+        records = [
+            {'text': 'Импорт {i}'.format(i=i), 'author': 'auth',
+             'group': 'test-slug', 'pub_date': '2020-01-0{i}T10:00:00'
+             .format(i=i + 1)}
+            for i in range(5)
+        ]
+        records += [
+            {'text': '', 'author': 'auth'},
+            {'text': 'x' * 10001, 'author': 'auth'},
+            {'text': 'Без автора', 'author': 'nobody'},
+            {'text': 'Без группы', 'author': 'auth', 'group': 'none'},
+        ]
+        lines = [json.dumps(record) for record in records] + ['{broken']
+        path = self.write_file('posts.jsonl', '\n'.join(lines))
+        generation = get_generation(feed_scope('group', self.group.pk))
+        stdout, stderr = self.import_posts(path, '--batch-size', '2')
+        self.assertIn('Импортировано постов: 5, пропущено: 5.', stdout)
+        self.assertNotIn('Создано', stdout)
+        self.assertEqual(stderr.count('пропущена'), 5)
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(
+            Post.objects.order_by('pub_date').first().pub_date.year, 2020)
+        self.assertEqual(author_posts_count(self.user), 5)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+        self.assertNotEqual(
+            get_generation(feed_scope('group', self.group.pk)), generation)
+        self.assertEqual(PostSearchResults('импорт').count(), 5)
+
+    def test_import_csv_resumes_from_checkpoint(self):
+        """Повторный запуск с контрольной точкой не дублирует посты."""
+        path = self.write_file(
+            'posts.csv',
+            'text,author,group\n'
+            'Первый,auth,test-slug\n'
+            'Второй,auth,\n'
+        )
+        checkpoint = os.path.join(self.directory, 'checkpoint')
+        self.import_posts(path, '--checkpoint', checkpoint)
+        with open(path, 'a', encoding='utf-8') as import_file:
+            import_file.write('Третий,auth,\n')
+        self.import_posts(path, '--checkpoint', checkpoint)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Второй', 'Первый', 'Третий'])
+        with open(checkpoint) as checkpoint_file:
+            self.assertEqual(checkpoint_file.read(), '3')
+
+    def test_imported_posts_reach_followers_timelines(self):
+        """Импортированные посты попадают в ленты подписчиков автора."""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        records = [
+            {'text': 'Импорт для ленты {i}'.format(i=i), 'author': 'auth'}
+            for i in range(3)
+        ]
+        path = self.write_file('posts.jsonl', '\n'.join(
+            json.dumps(record) for record in records))
+        self.import_posts(path, '--batch-size', '2')
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=reader).values_list(
+                'post_id', flat=True)),
+            set(Post.objects.values_list('pk', flat=True)))
+
+    def test_file_dates_do_not_change_model_fields(self):
+        """
+        Даты из файла сохраняются у импортированных постов, а посты,
+        созданные обычным путем, по-прежнему получают текущее время.
+        """
+        path = self.write_file('posts.jsonl', json.dumps({
+            'text': 'Старый пост', 'author': 'auth',
+            'pub_date': '2015-05-05T10:00:00',
+        }))
+        self.import_posts(path)
+        post = Post.objects.get(text='Старый пост')
+        self.assertEqual(post.pub_date.year, 2015)
+        self.assertEqual(post.updated_at, post.pub_date)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        fresh = Post.objects.create(text='Новый пост', author=self.user)
+        self.assertEqual(fresh.pub_date.year, timezone.now().year)
+
+    def test_dates_are_written_by_the_insert(self):
+        """
+        Даты из файла записываются самой вставкой, без UPDATE постов,
+        в том числе для постов с одинаковым текстом.
+        """
+        path = self.write_file('posts.jsonl', '\n'.join(
+            json.dumps({
+                'text': 'Повтор', 'author': 'auth',
+                'pub_date': '2016-0{i}-01T10:00:00'.format(i=i),
+            })
+            for i in range(1, 4)
+        ))
+        with CaptureQueriesContext(connection) as queries:
+            self.import_posts(path)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ])
+        self.assertEqual(
+            sorted(Post.objects.values_list('pub_date__month', flat=True)),
+            [1, 2, 3])
+        self.assertEqual(
+            Post.objects.filter(updated_at=F('pub_date')).count(), 3)
@@ -1,8 +1,15 @@
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
 from django.test import TestCase
 from django.conf import settings
 
-from posts.models import Group, Post
+from posts.models import AuthorStats, Group, Post, author_posts_count
 
 User = get_user_model()
 SYMBOLS = settings.SYMBOLS_FOR_TEXT_POST_STR
@@ -56,3 +63,88 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     self.post._meta.get_field(field).help_text, expected_value
                 )
+
+
+class PostCountersTest(TestCase):
+    """
+    Класс для создания тестов счетчиков постов авторов и групп,
+    поддерживаемых сигналами модели Post.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group_second = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-second',
+            description='Тестовое описание 2',
+        )
+
+    def assertCounters(self, author, group, group_second):
+        """Сверяет счетчики автора и обеих групп с ожидаемыми."""
+        self.user.refresh_from_db()
+        self.group.refresh_from_db()
+        self.group_second.refresh_from_db()
+        self.assertEqual(author_posts_count(self.user), author)
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.group_second.posts_count, group_second)
+
+    def test_counters_follow_post_create_change_and_delete(self):
+        """
+        Счетчики увеличиваются при создании поста, переносятся при
+        смене группы и уменьшаются при удалении.
+        """
+        post = Post.objects.create(
+            text='Пост для счетчиков.', author=self.user, group=self.group)
+        Post.objects.create(text='Пост без группы.', author=self.user)
+        self.assertCounters(2, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group_second
+        post.save()
+        self.assertCounters(2, 0, 1)
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_reconcile_command_fixes_drift(self):
+        """
+        Команда reconcile_post_counters исправляет счетчики после
+        вставки постов в обход сигналов.
+        """
+        Post.objects.bulk_create([
+            Post(text='Пост {i}.'.format(i=i),
+                 author=self.user, group=self.group)
+            for i in range(3)
+        ])
+        self.assertCounters(0, 0, 0)
+        call_command('reconcile_post_counters', stdout=StringIO())
+        self.assertCounters(3, 3, 0)
+
+    def test_migration_fills_counters_of_migrated_database(self):
+        """
+        Заполнение счетчиков в миграции читает и пишет базу, которую
+        мигрируют, а не основную.
+        """
+        migration = import_module('posts.migrations.0005_post_counters')
+        author = User.objects.db_manager('replica').create_user(
+            username='replica-auth')
+        group = Group.objects.using('replica').create(
+            title='Группа реплики', slug='replica-slug')
+        Post.objects.using('replica').bulk_create([
+            Post(text='Пост {i}.'.format(i=i), author=author, group=group)
+            for i in range(3)
+        ])
+        migration.fill_counters(
+            apps, SimpleNamespace(connection=connections['replica']))
+        self.assertEqual(AuthorStats.objects.using('replica').get(
+            user=author).posts_count, 3)
+        self.assertEqual(Group.objects.using('replica').get(
+            pk=group.pk).posts_count, 3)
+        self.assertFalse(AuthorStats.objects.using('default').exists())
+        self.assertCounters(0, 0, 0)
@@ -1,10 +1,15 @@
+from http import HTTPStatus
+
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
 
 from posts.models import Post, Group
+from posts.paginators import CachedCountPaginator
+from posts.search import PostSearchResults
 
 User = get_user_model()
 # Количество объектов на страницу выводилось в константу
@@ -43,6 +48,8 @@ class PaginatorViewsTest(TestCase):
         cls.page_second_obj = len(page_second.object_list)
 
     def setUp(self) -> None:
+        # bulk_create не вызывает сигналы, сбрасывающие кеш количества.
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -135,3 +142,150 @@ class PaginatorViewsTest(TestCase):
             kwargs={'username': self.user.username})) + '?page=2')
         self.assertEqual(
             len(response.context['page_obj']), self.page_second_obj)
+
+
+class CursorPaginatorTest(TestCase):
+    """
+    Класс для создания тестов курсорной паджинации лент постов
+    по параметрам ?after= и ?before=.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create([
+            Post(
+                author=cls.user,
+                text='Создание поста {i} для курсора.'.format(i=i))
+            for i in range(1, 26)
+        ])
+        cls.expected = list(Post.objects.all())
+
+    def test_cursor_pages_cover_feed_in_order(self):
+        """
+        Переход по ссылкам ?after= выдает все посты ленты по порядку
+        без повторов и пропусков.
+        """
+        posts = []
+        params = {}
+        while True:
+            response = self.client.get(reverse('posts:index'), params)
+            page_obj = response.context['page_obj']
+            posts.extend(page_obj.object_list)
+            if not page_obj.has_next():
+                break
+            params = {'after': page_obj.next_cursor}
+        self.assertEqual(posts, self.expected)
+
+    def test_cursor_before_returns_previous_page(self):
+        """Ссылка ?before= со второй страницы возвращает первую."""
+        first = self.client.get(reverse('posts:index')).context['page_obj']
+        second = self.client.get(
+            reverse('posts:index'),
+            {'after': first.next_cursor}).context['page_obj']
+        self.assertTrue(second.has_previous())
+        previous = self.client.get(
+            reverse('posts:index'),
+            {'before': second.previous_cursor}).context['page_obj']
+        self.assertEqual(
+            list(previous.object_list), list(first.object_list))
+        self.assertFalse(previous.has_previous())
+        self.assertTrue(previous.has_next())
+
+    def test_deep_page_numbers_are_not_found(self):
+        """
+        Номера страниц старых ссылок работают до PAGINATOR_MAX_PAGE
+        без подсчета постов, более глубокие не обслуживаются.
+        """
+        address = reverse('posts:index')
+        with self.assertNumQueries(1):
+            response = self.client.get(address, {'page': 3})
+        self.assertEqual(
+            list(response.context['page_obj']), self.expected[20:])
+        response = self.client.get(address, {'page': 5})
+        self.assertEqual(len(response.context['page_obj']), 0)
+        response = self.client.get(
+            address, {'page': settings.PAGINATOR_MAX_PAGE + 1})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Некорректный курсор приводит к первой странице ленты."""
+        for cursor in ('garbage', 'WyJ4IiwieSJd', 'W10'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('posts:index'), {'after': cursor})
+                self.assertEqual(
+                    list(response.context['page_obj']),
+                    self.expected[:COUNT_PER_PAGE])
+
+
+class CachedCountPaginatorTest(TestCase):
+    """
+    Класс для создания тестов паджинатора с кешированным количеством
+    объектов.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create([
+            Post(author=cls.user, text='Пост {i}.'.format(i=i))
+            for i in range(1, 14)
+        ])
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_count_is_cached(self):
+        """Повторный подсчет того же queryset не обращается к БД."""
+        paginator = CachedCountPaginator(Post.objects.all(), COUNT_PER_PAGE)
+        self.assertEqual(paginator.count, 13)
+        with self.assertNumQueries(0):
+            paginator = CachedCountPaginator(
+                Post.objects.all(), COUNT_PER_PAGE)
+            self.assertEqual(paginator.count, 13)
+
+    def test_count_is_invalidated_on_post_save_and_delete(self):
+        """Создание и удаление поста сбрасывают кеш количества."""
+        CachedCountPaginator(Post.objects.all(), COUNT_PER_PAGE).count
+        post = Post.objects.create(author=self.user, text='Новый пост.')
+        paginator = CachedCountPaginator(Post.objects.all(), COUNT_PER_PAGE)
+        self.assertEqual(paginator.count, 14)
+        post.delete()
+        paginator = CachedCountPaginator(Post.objects.all(), COUNT_PER_PAGE)
+        self.assertEqual(paginator.count, 13)
+
+    def test_cold_count_is_one_query(self):
+        """Количество без кеша считается одним запросом."""
+        with self.assertNumQueries(1):
+            CachedCountPaginator(Post.objects.all(), COUNT_PER_PAGE).count
+
+    def test_group_count_is_invalidated_on_group_change(self):
+        """
+        Количество групп сбрасывается созданием и удалением группы,
+        хотя посты при этом не меняются.
+        """
+        groups = Group.objects.order_by('pk')
+        self.assertEqual(
+            CachedCountPaginator(groups, COUNT_PER_PAGE).count, 0)
+        group = Group.objects.create(
+            title='Новая группа', slug='new-group', description='Описание')
+        self.assertEqual(
+            CachedCountPaginator(groups, COUNT_PER_PAGE).count, 1)
+        group.delete()
+        self.assertEqual(
+            CachedCountPaginator(groups, COUNT_PER_PAGE).count, 0)
+
+    def test_search_count_is_cached(self):
+        """
+        Количество найденных постов, которое показывает страница
+        поиска, кешируется до изменения постов.
+        """
+        self.assertEqual(CachedCountPaginator(
+            PostSearchResults('Пост'), COUNT_PER_PAGE).count, 13)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(
+                PostSearchResults('Пост'), COUNT_PER_PAGE).count, 13)
+        Post.objects.create(author=self.user, text='Новый пост.')
+        self.assertEqual(CachedCountPaginator(
+            PostSearchResults('Пост'), COUNT_PER_PAGE).count, 14)
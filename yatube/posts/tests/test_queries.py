@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import query_budget
+from posts.models import Group, Post
+
+User = get_user_model()
+# Запросы сессии и пользователя при каждом обращении авторизованного
+# клиента.
+AUTH_QUERIES = 2
+
+
+class PostsQueryBudgetTests(TestCase):
+    """
+    Класс для создания тестов, фиксирующих количество SQL-запросов
+    страниц приложения posts. Количество не должно зависеть
+    от числа постов на странице.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(
+                author=cls.user,
+                group=cls.group,
+                text='Создание поста {i} для бюджета.'.format(i=i))
+            for i in range(1, 26)
+        ])
+        cls.post = Post.objects.first()
+        cls.guest_budgets = {
+            reverse('posts:index'): 1,
+            reverse('posts:index') + '?page=2': 2,
+            reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}): 2,
+            reverse(
+                'posts:profile', kwargs={'username': cls.user.username}): 2,
+            # Включая запрос валидаторов условного GET (ETag).
+            reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}): 2,
+        }
+        cls.authorized_budgets = {
+            reverse('posts:post_create'): 1,
+            reverse('posts:post_edit', kwargs={'post_id': cls.post.pk}): 2,
+        }
+
+    def setUp(self) -> None:
+        # Бюджеты рассчитаны на пустой кеш.
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_pages_query_budget(self):
+        """Страницы posts укладываются в бюджет запросов для гостя."""
+        for address, budget in self.guest_budgets.items():
+            with self.subTest(address=address):
+                with query_budget(budget):
+                    self.client.get(address)
+
+    def test_authorized_pages_query_budget(self):
+        """
+        Страницы posts укладываются в бюджет запросов
+        для авторизованного пользователя.
+        """
+        budgets = {**self.guest_budgets, **self.authorized_budgets}
+        for address, budget in budgets.items():
+            with self.subTest(address=address):
+                with query_budget(budget + AUTH_QUERIES):
+                    self.authorized_client.get(address)
+
+    @query_budget(1)
+    def test_feed_page_loads_related_in_one_query(self):
+        """Автор и группа постов ленты загружаются одним запросом."""
+        for post in Post.objects.feed()[:10]:
+            post.author.get_full_name()
+            post.group.slug
+
+    def test_query_budget_reports_exceeded_budget(self):
+        """Превышение бюджета приводит к ошибке с перечнем запросов."""
+        with self.assertRaisesMessage(AssertionError, 'posts_post'):
+            with query_budget(1):
+                for post in Post.objects.all()[:2]:
+                    post.author.username
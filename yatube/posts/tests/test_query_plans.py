@@ -0,0 +1,76 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+POSTS_TABLE = Post._meta.db_table
+# Полный проход таблицы без индекса или сортировка во временном B-дереве.
+BAD_PLAN = re.compile(
+    r'SCAN (TABLE )?{table}(?! USING (COVERING )?INDEX)|USE TEMP B-TREE'
+    .format(table=POSTS_TABLE))
+
+
+class PostQueryPlanTest(TestCase):
+    """
+    Класс для проверки планов запросов к таблице постов: каждый
+    запрос лент из posts/views.py должен обслуживаться индексом
+    без полного сканирования и сортировки во временном B-дереве.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(
+                author=cls.user,
+                group=cls.group,
+                text='Создание поста {i} для плана запроса.'.format(i=i))
+            for i in range(1, 26)
+        ])
+
+    def feed_addresses(self):
+        """Адреса лент: первая страница, курсорные и номерные переходы."""
+        feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        ]
+        addresses = []
+        for feed in feeds:
+            page_obj = self.client.get(feed).context['page_obj']
+            addresses += [
+                feed,
+                feed + '?page=2',
+                feed + '?after=' + page_obj.next_cursor,
+                feed + '?before=' + page_obj.next_cursor,
+            ]
+        return addresses
+
+    def test_feed_queries_use_indexes(self):
+        """
+        Запросы к posts_post со страниц лент не сканируют таблицу
+        целиком и не сортируют выборку во временном B-дереве.
+        """
+        for address in self.feed_addresses():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(address)
+            for query in queries:
+                sql = query['sql']
+                if POSTS_TABLE not in sql or not sql.startswith('SELECT'):
+                    continue
+                with self.subTest(address=address, sql=sql):
+                    with connection.cursor() as cursor:
+                        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                        plan = '\n'.join(row[-1] for row in cursor)
+                    self.assertNotRegex(plan, BAD_PLAN)
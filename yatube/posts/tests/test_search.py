@@ -0,0 +1,84 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.admin import PostAdmin
+from posts.models import Post
+from posts.search import drop_search_index, ensure_search_index
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    """
+    Класс для создания тестов полнотекстового поиска постов
+    по индексу FTS5.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            text='Кошки любят <b>молоко</b> и тёплый плед.',
+            author=cls.user,
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.user, text='Собаки любят гулять. {i}'.format(i=i))
+            for i in range(12)
+        ])
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params})
+
+    def test_search_finds_matching_posts(self):
+        """Поиск находит посты по слову, в том числе созданные bulk_create."""
+        response = self.search('собаки')
+        self.assertEqual(response.context['page_obj'].paginator.count, 12)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        response = self.search('собаки', page=2)
+        self.assertEqual(len(response.context['page_obj']), 2)
+
+    def test_search_highlights_escaped_snippet(self):
+        """Совпадения выделяются <mark>, а HTML поста экранируется."""
+        response = self.search('молоко')
+        self.assertContains(response, '<mark>молоко</mark>')
+        self.assertNotContains(response, '<b>')
+
+    def test_search_index_follows_edit_and_delete(self):
+        """Изменение и удаление поста отражаются в индексе."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Попугаи любят орехи.'
+        post.save()
+        self.assertEqual(len(self.search('молоко').context['page_obj']), 0)
+        self.assertEqual(len(self.search('попугаи').context['page_obj']), 1)
+        post.delete()
+        self.assertEqual(len(self.search('попугаи').context['page_obj']), 0)
+
+    def test_search_ignores_fts_syntax(self):
+        """Спецсимволы и операторы FTS5 в запросе не вызывают ошибок."""
+        for query in ('"', 'AND', 'собаки OR (', '*', ''):
+            with self.subTest(query=query):
+                response = self.search(query)
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке возвращает посты, найденные индексом."""
+        admin = PostAdmin(Post, AdminSite())
+        queryset, use_distinct = admin.get_search_results(
+            None, Post.objects.all(), 'кошки')
+        self.assertEqual(list(queryset), [self.post])
+        self.assertFalse(use_distinct)
+
+    def test_search_index_is_rebuilt_without_triggers(self):
+        """
+        Если триггеры индекса пропали, ensure_search_index пересоздает
+        их и перестраивает индекс по таблице постов.
+        """
+        drop_search_index(connection)
+        ensure_search_index(connection)
+        self.assertEqual(len(self.search('кошки').context['page_obj']), 1)
+        Post.objects.create(text='Кошки спят.', author=self.user)
+        self.assertEqual(len(self.search('кошки').context['page_obj']), 2)
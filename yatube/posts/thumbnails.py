@@ -0,0 +1,68 @@
+from django.conf import settings
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as thumbnail_defaults
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from tasks.queue import task
+
+from .models import Post
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    """
+    Бэкенд sorl-thumbnail, который не уменьшает изображения при
+    отрисовке страниц: get_thumbnail возвращает готовую миниатюру или
+    None. Создает миниатюры только вызов с generate=True из задачи
+    generate_thumbnails.
+    """
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if options.pop('generate', False):
+            return super().get_thumbnail(file_, geometry_string, **options)
+        source = ImageFile(file_)
+        name = self._get_thumbnail_filename(
+            source, geometry_string, self.get_options(source, options))
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+    def get_options(self, source, options):
+        """
+        Параметры миниатюры с умолчаниями, как их дополняет
+        get_thumbnail базового класса: от них зависит имя файла.
+        """
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(thumbnail_defaults, attr):
+                options.setdefault(key, value)
+        return options
+
+
+def post_thumbnail(image, size):
+    """
+    Готовая миниатюра изображения поста размера size из
+    POST_THUMBNAILS или None, если она еще не создана.
+    """
+    geometry, options = settings.POST_THUMBNAILS[size]
+    return default.backend.get_thumbnail(image, geometry, **options)
+
+
+@task
+def generate_thumbnails(post_id):
+    """
+    Создает миниатюры изображения поста всех размеров POST_THUMBNAILS.
+    Уменьшение изображений нагружает процессор, поэтому обработчик
+    очереди для них запускают с --executor process. После создания
+    пост сохраняется, чтобы сбросить кеш страниц с оригиналом.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    for geometry, options in settings.POST_THUMBNAILS.values():
+        default.backend.get_thumbnail(
+            post.image, geometry, generate=True, **options)
+    post.save(update_fields=['updated_at'])
@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import (AuthorStats, Follow, Post, TimelineEntry,
+                     author_followers_count)
+
+
+def fan_out_post(post):
+    """
+    Добавляет новый пост в ленты подписчиков автора (fan-out on write).
+    Посты авторов, у которых подписчиков больше TIMELINE_FANOUT_LIMIT,
+    не раскладываются: читатели забирают их сами в sync_timeline.
+    """
+    if author_followers_count(post.author_id) > settings.TIMELINE_FANOUT_LIMIT:
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post.pk,
+                author_id=post.author_id,
+                pub_date=post.pub_date,
+            )
+            for user_id in followers.iterator()
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_posts(posts):
+    """
+    Раскладывает посты queryset posts в ленты подписчиков авторов,
+    как fan_out_post, но одним запросом подписок на все посты. Нужна
+    после bulk_create, который не отправляет post_save.
+    """
+    posts = list(posts.values_list('pk', 'author_id', 'pub_date'))
+    authors = {author_id for _, author_id, _ in posts}
+    popular = AuthorStats.objects.filter(
+        user_id__in=authors,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('user_id', flat=True)
+    followers = defaultdict(list)
+    for user_id, author_id in Follow.objects.filter(
+            author_id__in=authors - set(popular)).values_list(
+            'user_id', 'author_id').iterator():
+        followers[author_id].append(user_id)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for post_id, author_id, pub_date in posts
+            for user_id in followers[author_id]
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def pull_posts(follow):
+    """
+    Переносит в ленту подписчика посты автора, опубликованные после
+    follow.synced_at, но не больше TIMELINE_BACKFILL последних.
+    Используется при подписке и для авторов без fan-out on write.
+    """
+    posts = Post.objects.filter(author_id=follow.author_id)
+    if follow.synced_at is not None:
+        posts = posts.filter(pub_date__gte=follow.synced_at)
+    posts = list(posts.order_by('-pub_date', '-pk').values_list(
+        'pk', 'pub_date')[:settings.TIMELINE_BACKFILL])
+    if not posts:
+        return
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=follow.user_id,
+                post_id=post_id,
+                author_id=follow.author_id,
+                pub_date=pub_date,
+            )
+            for post_id, pub_date in posts
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    follow.synced_at = posts[0][1]
+    Follow.objects.filter(pk=follow.pk).update(synced_at=follow.synced_at)
+
+
+def sync_timeline(user):
+    """
+    Забирает в ленту пользователя новые посты авторов с большим числом
+    подписчиков (fan-out on read). Порог ниже лимита fan-out on write,
+    чтобы пост автора, число подписчиков которого колеблется около
+    лимита, не пропал из ленты.
+    """
+    follows = Follow.objects.filter(
+        user=user,
+        author__post_stats__followers_count__gt=(
+            settings.TIMELINE_FANOUT_LIMIT // 2),
+    )
+    for follow in follows:
+        pull_posts(follow)
+
+
+def remove_author(user_id, author_id):
+    """Убирает из ленты пользователя посты автора после отписки."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
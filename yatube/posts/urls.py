@@ -1,9 +1,10 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 urlpatterns = [path('', views.index, name='index'),
+               path('groups/', views.groups, name='groups'),
                path('group/<slug:slug>/',
                     views.group_posts,
                     name='group_list'),
@@ -11,7 +12,32 @@ urlpatterns = [path('', views.index, name='index'),
                     name='profile'),
                path('posts/<int:post_id>/', views.post_detail,
                     name='post_detail'),
+               path('search/', views.search, name='search'),
+               path('follow/', views.follow_index, name='follow_index'),
+               path('profile/<str:username>/follow/', views.profile_follow,
+                    name='profile_follow'),
+               path('profile/<str:username>/unfollow/',
+                    views.profile_unfollow,
+                    name='profile_unfollow'),
                path('create/', views.post_create,
                     name='post_create'),
                path('posts/<int:post_id>/edit/', views.post_edit,
-                    name='post_edit'), ]
+                    name='post_edit'),
+               path('api/v1/posts/', api.index, name='api_index'),
+               path('api/v1/posts/<int:post_id>/', api.post_detail,
+                    name='api_post_detail'),
+               path('api/v1/group/<slug:slug>/', api.group_posts,
+                    name='api_group_list'),
+               path('api/v1/profile/<str:username>/', api.profile,
+                    name='api_profile'),
+               path('rss/', feeds.CachedPostsFeed(), name='index_rss'),
+               path('atom/', feeds.AtomPostsFeed(), name='index_atom'),
+               path('group/<slug:slug>/rss/', feeds.GroupPostsFeed(),
+                    name='group_list_rss'),
+               path('group/<slug:slug>/atom/', feeds.AtomGroupPostsFeed(),
+                    name='group_list_atom'),
+               path('profile/<str:username>/rss/', feeds.ProfilePostsFeed(),
+                    name='profile_rss'),
+               path('profile/<str:username>/atom/',
+                    feeds.AtomProfilePostsFeed(),
+                    name='profile_atom'), ]
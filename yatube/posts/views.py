@@ -1,77 +1,232 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
+from django.core.paginator import EmptyPage
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition
 
+from core.middleware import cache_anonymous_page
+from core.routers import replica_reads
+
+from .cache import (POSTS_SCOPE, feed_cache_key, feed_etag, get_generation,
+                    make_etag)
 from .forms import PostForm
-from .models import Group, Post
+from .models import Follow, Group, Post, TimelineEntry, author_posts_count
+from .paginators import CachedCountPaginator, CursorPaginator
+from .search import PostSearchResults
+from .timeline import sync_timeline
 
 count_per_page = settings.COUNT_PER_PAGE
+feed_cache_timeout = settings.FEED_CACHE_TIMEOUT
 LETTERS_FOR_TITLE = 30
 
 
+def get_page_obj(request, post_list):
+    """
+    Returns the requested page of a feed. Pages are addressed by opaque
+    ?after=/?before= cursors; ?page=N still works for old links up to
+    PAGINATOR_MAX_PAGE, deeper page numbers are not found.
+    """
+    paginator = CursorPaginator(post_list, count_per_page)
+    try:
+        return paginator.get_page(
+            request.GET.get('page'),
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    except EmptyPage:
+        raise Http404('Page not found')
+
+
+def get_feed_context(request, post_list, feed, scope_id=None):
+    """
+    Returns the context for a cached feed fragment. The page is fetched
+    lazily, so a fragment cache hit skips the feed queries entirely.
+    """
+    return {
+        'page_obj': SimpleLazyObject(
+            lambda: get_page_obj(request, post_list)),
+        'feed_key': feed_cache_key(request, feed, scope_id),
+        'feed_cache_timeout': feed_cache_timeout,
+    }
+
+
+def index_etag(request):
+    return feed_etag(request, 'index')
+
+
+def get_group(request, slug):
+    """Returns the group of the page, looked up once per request."""
+    if not hasattr(request, '_group'):
+        request._group = get_object_or_404(Group, slug=slug)
+    return request._group
+
+
+def get_author(request, username):
+    """
+    Returns the author of the profile, looked up once per request
+    together with whether the current user follows them.
+    """
+    if not hasattr(request, '_author'):
+        authors = User.objects.select_related('post_stats')
+        if request.user.is_authenticated:
+            authors = authors.annotate(is_followed=Exists(
+                Follow.objects.filter(
+                    user=request.user, author=OuterRef('pk'))))
+        request._author = get_object_or_404(authors, username=username)
+    return request._author
+
+
+def groups_etag(request):
+    return feed_etag(request, 'groups')
+
+
+def group_posts_etag(request, slug):
+    return feed_etag(request, 'group', get_group(request, slug).pk)
+
+
+def profile_etag(request, username):
+    author = get_author(request, username)
+    return make_etag(
+        feed_etag(request, 'profile', author.pk),
+        getattr(author, 'is_followed', False))
+
+
+def get_post_validators(request, post_id):
+    """
+    Returns everything the post page shows: the post's modification
+    stamp, its author's name and post count and its group's title
+    and slug, fetched with a single query per request. Renaming the
+    author or the group leaves updated_at as it is, so the page sends
+    no Last-Modified and is validated by the ETag alone.
+    """
+    if not hasattr(request, '_post_validators'):
+        request._post_validators = Post.objects.filter(
+            pk=post_id).values_list(
+            'updated_at',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'author__post_stats__posts_count',
+            'group__title',
+            'group__slug',
+        ).first()
+    return request._post_validators
+
+
+def post_detail_etag(request, post_id):
+    validators = get_post_validators(request, post_id)
+    if validators is not None:
+        return make_etag(request.user.pk or 0, post_id, *validators)
+
+
+def search_etag(request):
+    return make_etag(
+        request.user.pk or 0,
+        request.GET.get('q', ''),
+        request.GET.get('page', ''),
+        get_generation(POSTS_SCOPE),
+    )
+
+
+@cache_anonymous_page
+@replica_reads
+@condition(etag_func=index_etag)
 def index(request):
     """Information which is showing up on the start page."""
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, count_per_page)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    context = {
-        'page_obj': page_obj,
-    }
+    post_list = Post.objects.feed()
+    context = get_feed_context(request, post_list, 'index')
     return render(request, 'posts/index.html', context)
 
 
+@cache_anonymous_page
+@replica_reads
+@condition(etag_func=group_posts_etag)
 def group_posts(request, slug):
     """Information for displaying on the page with posts grouped by GROUPS."""
-    group = get_object_or_404(Group, slug=slug)
-    post_list = Post.objects.filter(group=group).all()
-    paginator = Paginator(post_list, count_per_page)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = get_group(request, slug)
+    post_list = Post.objects.feed().filter(group=group)
     context = {
         'group': group,
-        'page_obj': page_obj,
+        **get_feed_context(request, post_list, 'group', group.pk),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@replica_reads
+@condition(etag_func=groups_etag)
+def groups(request):
+    """
+    The view lists all groups, most recently active first. Post counts
+    and activity dates are maintained columns, so no aggregation runs.
+    """
+    group_list = Group.objects.order_by('-last_activity', '-pk')
+    context = get_feed_context(request, group_list, 'groups')
+    return render(request, 'posts/groups.html', context)
+
+
+@cache_anonymous_page
+@replica_reads
+@condition(etag_func=profile_etag)
 def profile(request, username):
     """
     The view shows a page profile of an authorised user.
     """
-    author = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=author).all()
-    paginator = Paginator(post_list, count_per_page)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    post_quantity = post_list.count()
+    author = get_author(request, username)
+    post_list = Post.objects.feed().filter(author=author)
+    post_quantity = author_posts_count(author)
     context = {
         'author': author,
-        'page_obj': page_obj,
         'post_quantity': post_quantity,
+        'following': getattr(author, 'is_followed', False),
+        **get_feed_context(request, post_list, 'profile', author.pk),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@cache_anonymous_page
+@replica_reads
+@condition(etag_func=post_detail_etag)
 def post_detail(request, post_id):
     """The view shows information about a current post."""
-    post_profile = get_object_or_404(Post, pk=post_id)
+    post_profile = get_object_or_404(
+        Post.objects.feed().select_related('author__post_stats'), pk=post_id)
     title = post_profile.text[:LETTERS_FOR_TITLE]
     context = {
         'post_profile': post_profile,
         'title': title,
+        'posts_count': author_posts_count(post_profile.author),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@condition(etag_func=search_etag)
+def search(request):
+    """
+    The view shows posts matching ?q=, ranked by relevance. It reads
+    from the primary: the full-text index query runs on the default
+    connection, so the rows have to come from the same database.
+    """
+    query = request.GET.get('q', '').strip()
+    paginator = CachedCountPaginator(
+        PostSearchResults(query), count_per_page)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     """The view creates a new post by a special form."""
     form = PostForm()
     if request.method == 'POST':
-        form = PostForm(request.POST)
+        form = PostForm(request.POST, files=request.FILES)
         if form.is_valid():
             new_post = form.save(False)
             new_post.author = request.user
@@ -88,12 +243,14 @@ def post_edit(request, post_id):
     """
     This view edits the post by its id and saves changes in database.
     """
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author'), pk=post_id)
     author = post.author
     if author != request.user:
         return redirect('posts:post_detail', post_id)
 
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post)
     is_edit = True
     context = {
         'form': form,
@@ -105,3 +262,34 @@ def post_edit(request, post_id):
             form.save()
             return redirect('posts:post_detail', post_id)
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+def follow_index(request):
+    """The view shows posts of the authors the user follows."""
+    sync_timeline(request.user)
+    timeline = TimelineEntry.objects.filter(
+        user=request.user).select_related(
+        'post__author', 'post__group').order_by('-pub_date', '-post_id')
+    context = {
+        'page_obj': get_page_obj(request, timeline),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    """The view subscribes the user to the author."""
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    """The view unsubscribes the user from the author."""
+    author = get_object_or_404(User, username=username)
+    for follow in Follow.objects.filter(user=request.user, author=author):
+        follow.delete()
+    return redirect('posts:profile', username=username)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'locked_at', 'last_error')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Task, TaskAdmin)
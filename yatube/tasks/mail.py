@@ -0,0 +1,12 @@
+from django.core.mail import EmailMultiAlternatives
+
+from .queue import task
+
+
+@task
+def send_email(subject, body, from_email, recipient_list, html_message=None):
+    """Отправляет письмо из обработчика очереди, а не из запроса."""
+    message = EmailMultiAlternatives(subject, body, from_email, recipient_list)
+    if html_message:
+        message.attach_alternative(html_message, 'text/html')
+    message.send()
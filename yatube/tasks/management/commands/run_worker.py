@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.queue import claim_tasks, execute_task
+
+
+class Command(BaseCommand):
+    """
+    Обработчик очереди задач. Берет в работу готовые задачи
+    и выполняет их в пуле потоков или процессов, пока не будет
+    остановлен.
+    """
+    help = 'Выполняет задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.TASKS_WORKERS,
+            help='Количество потоков или процессов.',
+        )
+        parser.add_argument(
+            '--executor',
+            choices=('thread', 'process'),
+            default='thread',
+            help='Выполнять задачи в потоках или в процессах.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.TASKS_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        with self.get_executor(options['executor'], workers) as executor:
+            while True:
+                pks = claim_tasks(workers)
+                if pks:
+                    results = list(executor.map(execute_task, pks))
+                    self.stdout.write(
+                        'Выполнено задач: {done}, с ошибкой: {failed}'
+                        .format(done=results.count(True),
+                                failed=results.count(False)))
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+
+    def get_executor(self, kind, workers):
+        """
+        Пул для выполнения задач. Процессы запускаются через spawn
+        и заново настраивают Django, чтобы не делить с родителем
+        соединения с базой.
+        """
+        if kind == 'thread':
+            return ThreadPoolExecutor(max_workers=workers)
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
@@ -0,0 +1,79 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Класс Task используется для создания моделей Task (отложенная
+    задача очереди). Задачу выполняет команда run_worker; выполненные
+    задачи удаляются, а исчерпавшие попытки остаются со статусом
+    FAILED и текстом последней ошибки.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        verbose_name='Задача',
+        max_length=200
+    )
+    args = models.TextField(
+        verbose_name='Аргументы',
+        default='[]'
+    )
+    kwargs = models.TextField(
+        verbose_name='Именованные аргументы',
+        default='{}'
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попытки',
+        default=0
+    )
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='Максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Запустить не раньше',
+        default=timezone.now
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Создана',
+        auto_now_add=True
+    )
+
+    class Meta:
+        """
+        Внутренний класс Meta для хранения метаданных
+        класса Task.
+        """
+        ordering = ['run_at', 'pk']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='tasks_status_run_at_idx'),
+        ]
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self) -> str:
+        return '{name} #{pk}'.format(name=self.name, pk=self.pk)
@@ -0,0 +1,150 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+class TaskNotRegistered(ImportError):
+    """Имя задачи не указывает на функцию, отмеченную @task."""
+    pass
+
+
+def task(func=None, *, max_attempts=None):
+    """
+    Отмечает функцию как задачу очереди. Вызов func.enqueue(*args,
+    **kwargs) ставит ее в очередь; аргументы должны сериализоваться
+    в JSON.
+    """
+    def decorate(func):
+        func.task_name = '{module}.{name}'.format(
+            module=func.__module__, name=func.__qualname__)
+        func.max_attempts = max_attempts
+
+        def enqueue_func(*args, **kwargs):
+            return enqueue(func, args, kwargs)
+        func.enqueue = enqueue_func
+        return func
+    return decorate(func) if func is not None else decorate
+
+
+def enqueue(func, args=(), kwargs=None, delay=None):
+    """
+    Ставит задачу func в очередь. Задача сохраняется в текущей
+    транзакции, поэтому при ее откате задача тоже не выполнится.
+    При TASKS_EAGER задача выполняется сразу, как это сделал бы
+    обработчик очереди.
+    """
+    args = json.dumps(list(args))
+    kwargs = json.dumps(kwargs or {})
+    if settings.TASKS_EAGER:
+        func(*json.loads(args), **json.loads(kwargs))
+        return None
+    return Task.objects.create(
+        name=func.task_name,
+        args=args,
+        kwargs=kwargs,
+        max_attempts=func.max_attempts or settings.TASKS_MAX_ATTEMPTS,
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+
+
+def resolve(name):
+    """Функция задачи по ее имени."""
+    func = import_string(name)
+    if getattr(func, 'task_name', None) != name:
+        raise TaskNotRegistered(
+            'Функция {name} не отмечена как задача.'.format(name=name))
+    return func
+
+
+def retry_delay(attempts):
+    """Задержка перед повтором: растет вдвое с каждой попыткой."""
+    seconds = settings.TASKS_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.TASKS_RETRY_DELAY_MAX))
+
+
+def claim_tasks(limit):
+    """
+    Берет в работу до limit задач, время которых пришло, и задачи,
+    зависшие у упавшего обработчика дольше TASKS_LOCK_TIMEOUT.
+    Задача захватывается условным UPDATE, поэтому несколько
+    обработчиков не возьмут одну задачу дважды.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    candidates = Task.objects.filter(
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_at__lt=stale)
+    ).values_list('pk', 'status', 'locked_at')[:limit]
+    claimed = []
+    for pk, status, locked_at in list(candidates):
+        updated = Task.objects.filter(
+            pk=pk, status=status, locked_at=locked_at,
+        ).update(
+            status=Task.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def run_task(pk):
+    """
+    Выполняет взятую в работу задачу. Выполненная задача удаляется,
+    упавшая возвращается в очередь с задержкой или, если попытки
+    исчерпаны, получает статус FAILED. Возвращает True при успехе.
+    """
+    task = Task.objects.get(pk=pk)
+    try:
+        func = resolve(task.name)
+        func(*json.loads(task.args), **json.loads(task.kwargs))
+    except Exception:
+        error = traceback.format_exc()
+        tasks = Task.objects.filter(pk=pk)
+        if task.attempts < task.max_attempts:
+            tasks.update(
+                status=Task.QUEUED,
+                locked_at=None,
+                run_at=timezone.now() + retry_delay(task.attempts),
+                last_error=error,
+            )
+        else:
+            tasks.update(status=Task.FAILED, last_error=error)
+        return False
+    Task.objects.filter(pk=pk).delete()
+    return True
+
+
+def execute_task(pk):
+    """
+    Выполняет задачу в потоке или процессе обработчика и закрывает
+    открытые в нем соединения с базой.
+    """
+    try:
+        return run_task(pk)
+    finally:
+        connections.close_all()
+
+
+def run_pending(limit=None):
+    """
+    Выполняет в текущем потоке задачи, время которых пришло.
+    Возвращает количество успешно выполненных задач.
+    """
+    done = 0
+    while True:
+        pks = claim_tasks(limit or settings.TASKS_BATCH_SIZE)
+        if not pks:
+            return done
+        done += sum(run_task(pk) for pk in pks)
+        if limit:
+            return done
@@ -0,0 +1,152 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim_tasks, enqueue, run_pending, task
+
+calls = []
+
+
+@task
+def record_call(value, suffix=''):
+    calls.append(value + suffix)
+
+
+@task(max_attempts=2)
+def always_fail():
+    raise ValueError('Ошибка задачи')
+
+
+def not_a_task():
+    pass
+
+
+class TaskQueueTests(TestCase):
+    """
+    Класс для создания тестов очереди задач: постановки, выполнения,
+    повторов и захвата задач обработчиком.
+    """
+    def setUp(self) -> None:
+        calls.clear()
+
+    def test_enqueued_task_runs_once(self):
+        """Задача выполняется обработчиком один раз и удаляется."""
+        record_call.enqueue('запуск', suffix='!')
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['запуск!'])
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(run_pending(), 0)
+
+    def test_delayed_task_waits(self):
+        """Отложенная задача не выполняется раньше срока."""
+        enqueue(record_call, ['позже'], delay=timedelta(minutes=5))
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(run_pending(), 1)
+
+    def test_failed_task_is_retried_with_backoff(self):
+        """
+        Упавшая задача возвращается в очередь с задержкой, а после
+        последней попытки получает статус FAILED.
+        """
+        always_fail.enqueue()
+        run_pending()
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.QUEUED)
+        self.assertGreater(failed.run_at, timezone.now())
+        self.assertIn('Ошибка задачи', failed.last_error)
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, Task.FAILED)
+        self.assertEqual(failed.attempts, 2)
+
+    def test_only_registered_functions_run(self):
+        """Функция без @task из строки очереди не вызывается."""
+        Task.objects.create(
+            name='tasks.tests.test_queue.not_a_task', max_attempts=1)
+        run_pending()
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_task_is_claimed_once(self):
+        """Взятую в работу задачу не получит другой обработчик."""
+        record_call.enqueue('один')
+        self.assertEqual(len(claim_tasks(10)), 1)
+        self.assertEqual(claim_tasks(10), [])
+
+    def test_stale_task_is_reclaimed(self):
+        """Задача упавшего обработчика снова берется в работу."""
+        record_call.enqueue('снова')
+        claim_tasks(10)
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(len(claim_tasks(10)), 1)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_immediately(self):
+        """При TASKS_EAGER задача выполняется при постановке."""
+        record_call.enqueue('сразу')
+        self.assertEqual(calls, ['сразу'])
+        self.assertFalse(Task.objects.exists())
+
+
+class RunWorkerCommandTests(TransactionTestCase):
+    """
+    Класс для создания тестов команды run_worker, выполняющей задачи
+    в пуле потоков.
+    """
+    def test_run_worker_once(self):
+        """Команда run_worker --once выполняет готовые задачи."""
+        Task.objects.create(
+            name='tasks.mail.send_email',
+            args='["Тема", "Текст", null, ["user@example.com"]]',
+            max_attempts=1,
+        )
+        call_command(
+            'run_worker', '--once', '--workers', '2', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Task.objects.exists())
+
+
+class QueuedMailTests(TestCase):
+    """
+    Класс для создания тестов писем приложения users, которые
+    отправляются через очередь задач.
+    """
+    def test_signup_mail_is_queued(self):
+        """Приветственное письмо при регистрации ставится в очередь."""
+        self.client.post(reverse('users:signup'), {
+            'username': 'newbie',
+            'email': 'newbie@example.com',
+            'password1': 'Gl0bal-Passw0rd',
+            'password2': 'Gl0bal-Passw0rd',
+        })
+        self.assertEqual(mail.outbox, [])
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['newbie@example.com'])
+        self.assertIn('newbie', mail.outbox[0].body)
+
+    def test_password_reset_mail_is_queued(self):
+        """Письмо для сброса пароля отправляется обработчиком очереди."""
+        self.client.post(reverse('users:signup'), {
+            'username': 'forgetful',
+            'email': 'forgetful@example.com',
+            'password1': 'Gl0bal-Passw0rd',
+            'password2': 'Gl0bal-Passw0rd',
+        })
+        run_pending()
+        mail.outbox.clear()
+        response = self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'forgetful@example.com'})
+        self.assertRedirects(response, reverse('users:password_reset_done'))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(mail.outbox[0].to, ['forgetful@example.com'])
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'auth:user:{user_id}'
+
+
+def user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id=user_id)
+
+
+def forget_user(user_id):
+    """Удаляет пользователя из кеша CachedModelBackend."""
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который при USER_CACHE_ENABLED берет пользователя
+    сессии из кеша, а не из базы на каждый запрос. Кеш сбрасывается
+    при сохранении и удалении пользователя (в том числе при смене
+    пароля и входе) и при выходе, поэтому он должен быть общим для
+    всех процессов сервера.
+    """
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_ENABLED:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -3,6 +3,9 @@ from django.contrib.auth.forms import (PasswordResetForm,
                                        UserCreationForm,
                                        PasswordChangeForm,
                                        SetPasswordForm)
+from django.template import loader
+
+from tasks.mail import send_email
 
 User = get_user_model()
 
@@ -36,6 +39,23 @@ class PasswordResetForm(PasswordResetForm):
     model = User
     fields = ('email')
 
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        """
+        Письмо отрисовывается в запросе, а отправляется обработчиком
+        очереди задач.
+        """
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = ''.join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_message = None
+        if html_email_template_name is not None:
+            html_message = loader.render_to_string(
+                html_email_template_name, context)
+        send_email.enqueue(
+            subject, body, from_email, [to_email], html_message)
+
 
 class PasswordResetConfirmForm(SetPasswordForm):
     """
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+@override_settings(
+    USER_CACHE_ENABLED=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+)
+class CachedAuthTests(TestCase):
+    """
+    Класс используется для создания тестов сессий в кеше
+    и кешированного пользователя сессии.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', password='old-password-123')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.login(
+            username='auth', password='old-password-123')
+        self.address = reverse('about:author')
+
+    def test_authenticated_page_needs_no_auth_queries(self):
+        """Повторный запрос вошедшего пользователя не читает базу."""
+        self.authorized_client.get(self.address)
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get(self.address)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_user_save_invalidates_cache(self):
+        """Измененный пользователь читается из базы заново."""
+        self.authorized_client.get(self.address)
+        User.objects.filter(pk=self.user.pk).update(first_name='Старое')
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.authorized_client.get(self.address)
+        self.assertEqual(response.context['user'].first_name, 'Новое')
+
+    def test_password_change_keeps_session_and_drops_others(self):
+        """
+        После смены пароля сессия, в которой его меняли, остается,
+        другие сессии пользователя завершаются.
+        """
+        other_client = Client()
+        other_client.login(username='auth', password='old-password-123')
+        other_client.get(self.address)
+        self.authorized_client.post(
+            reverse('users:password_change_form'),
+            {
+                'old_password': 'old-password-123',
+                'new_password1': 'new-password-456',
+                'new_password2': 'new-password-456',
+            },
+        )
+        response = self.authorized_client.get(self.address)
+        self.assertTrue(response.context['user'].is_authenticated)
+        response = other_client.get(self.address)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_clears_cached_user(self):
+        """После выхода пользователь сессии не берется из кеша."""
+        self.authorized_client.get(self.address)
+        self.authorized_client.get(reverse('users:logout'))
+        response = self.authorized_client.get(self.address)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    @override_settings(USER_CACHE_ENABLED=False)
+    def test_user_is_read_from_database_without_shared_cache(self):
+        """Без общего кеша пользователь сессии читается из базы."""
+        self.authorized_client.get(self.address)
+        User.objects.filter(pk=self.user.pk).update(first_name='Новое')
+        response = self.authorized_client.get(self.address)
+        self.assertEqual(response.context['user'].first_name, 'Новое')
+
+    def test_model_backend_session_is_kept(self):
+        """Сессия, созданная с ModelBackend, остается действительной."""
+        session = self.authorized_client.session
+        session[BACKEND_SESSION_KEY] = (
+            'django.contrib.auth.backends.ModelBackend')
+        session.save()
+        response = self.authorized_client.get(self.address)
+        self.assertEqual(response.context['user'], self.user)
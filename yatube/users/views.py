@@ -2,9 +2,13 @@ from django.contrib.auth.views import (
     PasswordResetView,
     PasswordChangeView,
     PasswordResetConfirmView)
+from django.contrib.sites.shortcuts import get_current_site
+from django.template import loader
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
+from tasks.mail import send_email
+
 from .forms import (
     CreationForm,
     PasswordResetForm,
@@ -17,6 +21,26 @@ class SignUp(CreateView):
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if self.object.email:
+            self.send_welcome_email(self.object)
+        return response
+
+    def send_welcome_email(self, user):
+        """Ставит приветственное письмо в очередь задач."""
+        context = {
+            'user': user,
+            'site_name': get_current_site(self.request).name,
+            'domain': self.request.get_host(),
+            'protocol': 'https' if self.request.is_secure() else 'http',
+        }
+        subject = loader.render_to_string(
+            'users/signup_email_subject.txt', context)
+        body = loader.render_to_string('users/signup_email.txt', context)
+        send_email.enqueue(
+            ''.join(subject.splitlines()), body, None, [user.email])
+
 
 class PasswordChange(PasswordChangeView):
     form_class = PasswordChangeForm
@@ -42,13 +42,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'tasks.apps.TasksConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.PrimaryStickinessMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,12 +67,28 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# Скомпилированные шаблоны кешируются в памяти процесса. Включается
+# независимо от DEBUG переменной окружения YATUBE_CACHED_TEMPLATES;
+# изменения шаблонов тогда видны только после перезапуска сервера.
+CACHED_TEMPLATES = os.environ.get(
+    'YATUBE_CACHED_TEMPLATES', str(not DEBUG)).lower() in ('1', 'true', 'yes')
+
+if CACHED_TEMPLATES:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -89,9 +110,85 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        # Соединение переиспользуется запросами потока в течение минуты.
+        'CONN_MAX_AGE': 60,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    },
 }
 
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Реплики, с которых ленты и страницы постов читают посты, группы
+# и пользователей. Локально реплика включается переменной окружения
+# YATUBE_DB_REPLICAS=1 и наполняется командой sync_replicas.
+DATABASE_REPLICAS = (
+    ['replica'] if os.environ.get('YATUBE_DB_REPLICAS') else [])
+
+# Клиент, изменивший данные, столько секунд читает из основной базы.
+DATABASE_STICKY_COOKIE = 'primary_db'
+
+DATABASE_STICKY_SECONDS = 10
+
+# Настройки, которые core применяет к каждому соединению с SQLite.
+# WAL позволяет читать ленты во время записи постов, busy_timeout -
+# ждать освобождения базы записывающими вместо ошибки database is locked.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Отрицательное значение - размер кеша страниц в КиБ: 64 МиБ.
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+# Кеш, общий для всех процессов сервера: memcached по адресам
+# из YATUBE_MEMCACHED через запятую. Без него кеш живет в памяти
+# процесса и годится только для разработки, тестов и сервера в одном
+# процессе: сброс кеша, выход и смена пароля не доходят до других
+# процессов (manage.py check --deploy об этом предупреждает).
+MEMCACHED_LOCATION = os.environ.get('YATUBE_MEMCACHED', '')
+
+SHARED_CACHE = bool(MEMCACHED_LOCATION)
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': MEMCACHED_LOCATION.split(','),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# С общим кешем сессии читаются из кеша и сохраняются и в кеш, и в базу,
+# а пользователь сессии берется из кеша CachedModelBackend: запрос
+# вошедшего пользователя обычно не обращается к базе за ними. С кешем
+# в памяти процесса удаленная сессия или старый пароль оставались бы
+# действительными в других процессах, поэтому тогда оба кеша выключены.
+if SHARED_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# ModelBackend второй, чтобы сессии, созданные с ним, оставались
+# действительными.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+USER_CACHE_ENABLED = SHARED_CACHE
+
+USER_CACHE_TIMEOUT = 60 * 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -133,6 +230,46 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# collectstatic добавляет в имена файлов хеш содержимого и сохраняет
+# сжатые gzip и brotli копии. Шаблоны тогда ссылаются на файлы из
+# манифеста, поэтому без collectstatic хранилище не включается:
+# по умолчанию только при выключенном DEBUG, иначе переменной
+# окружения YATUBE_MANIFEST_STATIC.
+MANIFEST_STATIC = os.environ.get(
+    'YATUBE_MANIFEST_STATIC', str(not DEBUG)).lower() in ('1', 'true', 'yes')
+
+if MANIFEST_STATIC:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Файлы статики с хешем в имени не меняются, браузер хранит их год.
+STATIC_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Загружаемые файлы пишутся во временный файл на диске частями и не
+# держатся в памяти целиком. Файл больше UPLOAD_MAX_SIZE дальше
+# не записывается, форма отклоняет его по размеру.
+FILE_UPLOAD_HANDLERS = ['core.uploads.LimitedTemporaryFileUploadHandler']
+
+UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+
+POST_IMAGE_MAX_DIMENSION = 4096
+
+# Миниатюры изображений постов по размерам из шаблонов: геометрия
+# и параметры sorl-thumbnail. При отрисовке берутся только готовые
+# миниатюры, создает их обработчик очереди:
+# python manage.py run_worker --executor process
+POST_THUMBNAILS = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('960', {'upscale': False}),
+}
+
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -145,6 +282,95 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 COUNT_PER_PAGE = 10
 
+# Номера страниц лент (?page=N) из старых ссылок обслуживаются только
+# до этого номера, глубже листают курсорами ?after= и ?before=.
+PAGINATOR_MAX_PAGE = 10
+
+# Срок хранения количества найденных постов на странице поиска.
+PAGINATOR_COUNT_CACHE_TIMEOUT = 60 * 5
+
+FEED_CACHE_TIMEOUT = 60 * 15
+
+# Защита от одновременного пересчета кеша (core.cache.get_or_compute):
+# сколько секунд после срока отдается устаревшее значение, пока его
+# пересчитывает один процесс, срок блокировки пересчета, сколько
+# секунд ждать значение, которого в кеше нет, и насколько рано
+# начинается вероятностный пересчет.
+CACHE_STALE_TIMEOUT = 60
+
+CACHE_LOCK_TIMEOUT = 30
+
+CACHE_LOCK_WAIT = 2
+
+CACHE_EARLY_RECOMPUTE_BETA = 1.0
+
+# Страницы лент и постов кешируются целиком для анонимных посетителей,
+# если не DEBUG и кеш общий для процессов: иначе новый пост сбрасывал бы
+# страницы только в одном процессе. Переменная окружения
+# YATUBE_PAGE_CACHE задает это явно.
+PAGE_CACHE_ENABLED = os.environ.get(
+    'YATUBE_PAGE_CACHE',
+    str(SHARED_CACHE and not DEBUG)).lower() in ('1', 'true', 'yes')
+
+# Посетители с этими куками, как и с кукой сессии, обходят кеш страниц:
+# с ними страница может зависеть от пользователя.
+PAGE_CACHE_BYPASS_COOKIES = ('messages', DATABASE_STICKY_COOKIE)
+
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+API_MAX_PAGE_SIZE = 1000
+
+SYNDICATION_ITEMS = 20
+
+# Посты авторов, у которых подписчиков больше лимита, не раскладываются
+# по лентам при публикации, а забираются читателями при чтении ленты.
+TIMELINE_FANOUT_LIMIT = 10000
+
+TIMELINE_BACKFILL = 100
+
+TIMELINE_BATCH_SIZE = 1000
+
+# Очередь задач: при TASKS_EAGER задачи выполняются сразу при постановке.
+TASKS_EAGER = False
+
+TASKS_MAX_ATTEMPTS = 5
+
+TASKS_RETRY_DELAY = 30
+
+TASKS_RETRY_DELAY_MAX = 60 * 60
+
+TASKS_LOCK_TIMEOUT = 60 * 10
+
+TASKS_BATCH_SIZE = 100
+
+TASKS_WORKERS = 4
+
+TASKS_POLL_INTERVAL = 1.0
+
+# Доля запросов, для которых ServerTimingMiddleware замеряет SQL,
+# view и шаблоны: от 0 (выключено) до 1 (каждый запрос).
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.environ.get('YATUBE_SERVER_TIMING_SAMPLE_RATE', 1.0))
+
+# Замеры запросов пишутся строкой JSON в логгер core.timing. При DEBUG
+# они видны в заголовке Server-Timing, в лог попадают без DEBUG.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'WARNING' if DEBUG else 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ABSTRACT_CREATED_OBJECT_FOR_TESTS = 1
 
 SYMBOLS_FOR_TEXT_POST_STR = 15
@@ -13,8 +13,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import static_file
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -22,6 +28,14 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    # При DEBUG статику перехватывает runserver, в работе - веб-сервер;
+    # это запасной путь для запуска приложения без него.
+    re_path(r'^{prefix}(?P<path>.+)$'.format(
+        prefix=re.escape(settings.STATIC_URL.lstrip('/'))), static_file),
 ]
 
+if settings.DEBUG:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
 handler404 = 'core.views.page_not_found'